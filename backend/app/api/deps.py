@@ -1,4 +1,4 @@
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
@@ -10,6 +10,7 @@ from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.user import User
 from app.schemas import token as token_schema
+from app.services.admission_service import admission_controller, AdmissionRejected, retry_after_header
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
@@ -22,10 +23,7 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> User:
+def _token_subject(token: str) -> str:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -36,7 +34,35 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.id == token_data.sub).first()
+    return token_data.sub
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> User:
+    user = db.query(User).filter(User.id == _token_subject(token)).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
+
+async def evaluation_slot(
+    token: str = Depends(reusable_oauth2)
+) -> AsyncGenerator:
+    """
+    Admission control for evaluation endpoints: per-user rate limit plus a
+    global cap on concurrent evaluations. Rejects with 429 and Retry-After.
+    Declare it before other dependencies: it runs on the event loop from the
+    token alone, so throttled and queued requests hold no thread or DB connection.
+    """
+    try:
+        await admission_controller.acquire(_token_subject(token))
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.reason,
+            headers={"Retry-After": retry_after_header(e.retry_after)},
+        )
+    try:
+        yield
+    finally:
+        admission_controller.release()
@@ -1,13 +1,23 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Header, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 
 from app.api import deps
-from app.models.interview import InterviewSession, Question, Answer, Feedback
+from app.db.session import SessionLocal
+from app.models.interview import InterviewSession, Question, Answer, Feedback, SessionFact
 from app.models.user import User
 from app.schemas import interview as interview_schema
+from app.schemas import job as job_schema
 from app.services.ai_service import ai_service
+from app.services.admission_service import admission_controller
+from app.services.fact_service import FactIndex, extract_facts
+from app.services.export_service import export_user_history
+from app.services.job_service import job_queue
+from app.services.answer_index import answer_index
+from app.services.session_service import average_feedback_score, enqueue_improvement_plan, interrupt_sessions
 
 router = APIRouter()
 
@@ -19,32 +29,15 @@ class SessionCompleteSchema(BaseModel):
 
 @router.post("/start", response_model=interview_schema.InterviewSession)
 def start_interview(
+    _slot: None = Depends(deps.evaluation_slot),
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Start a new interview session.
     """
-    # If there's an existing in-progress session, end it first
-    active_session = db.query(InterviewSession).filter(
-        InterviewSession.user_id == current_user.id,
-        InterviewSession.status == "in_progress"
-    ).first()
-    
-    if active_session:
-        active_session.status = "interrupted"
-        active_session.end_time = datetime.now(timezone.utc)
-        # Ensure start_time is treated as UTC for subtraction
-        start_time = active_session.start_time
-        if start_time.tzinfo is None:
-            start_time = start_time.replace(tzinfo=timezone.utc)
-        active_session.total_duration = int((active_session.end_time - start_time).total_seconds())
-        # Calculate average score for the abandoned session if possible
-        answers = db.query(Answer).join(Question).filter(Question.session_id == active_session.id).all()
-        scores = [a.feedback.score for a in answers if a.feedback and a.feedback.score is not None]
-        if scores:
-            active_session.score = sum(scores) // len(scores)
-        db.add(active_session)
+    # If there's an existing in-progress session, end it first (one set-based UPDATE)
+    interrupt_sessions(db, InterviewSession.user_id == current_user.id)
 
     # Create Session
     session = InterviewSession(user_id=current_user.id, status="in_progress")
@@ -86,6 +79,40 @@ def get_my_sessions(
     ).order_by(InterviewSession.start_time.desc()).all()
     return sessions
 
+@router.get("/export")
+def export_my_history(
+    gzip: bool = False,
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Stream the current user's full interview history as NDJSON, one session per line.
+    """
+    user_id = current_user.id
+
+    def stream():
+        # The stream outlives the request-scoped session, so it owns its own
+        db = SessionLocal()
+        try:
+            yield from export_user_history(db, user_id, compress=gzip)
+        finally:
+            db.close()
+
+    filename = "interview-history.ndjson" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream(),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/admission/metrics")
+def get_admission_metrics(
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Queue depth and rejection counters for the evaluation admission layer.
+    """
+    return admission_controller.metrics()
+
 @router.get("/{session_id}", response_model=interview_schema.InterviewSession)
 def get_interview_session(
     session_id: int,
@@ -102,17 +129,17 @@ def get_interview_session(
     if not session:
         raise HTTPException(status_code=404, detail="Interview session not found")
     
-    # Section 3, Item 10: Generate improvement plan for completed sessions
-    session_dict = {
-        "id": session.id,
-        "score": session.score,
-        "status": session.status
-    }
-    
-    improvement_plan = None
-    if session.status == "completed":
-        improvement_plan = ai_service.generate_improvement_plan(session_dict)
-        
+    # Section 3, Item 10: Improvement plans for completed sessions are built by a
+    # background job queued on completion; until it finishes the plan is None and
+    # improvement_plan_status reports the job state. Reads never queue or retry it.
+    improvement_plan = (session.session_metadata or {}).get("improvement_plan")
+    improvement_plan_status = None
+    if improvement_plan is None:
+        plan_jobs = [j for j in job_queue.jobs_for_session(session.id) if j.kind == "improvement_plan"]
+        if plan_jobs:
+            improvement_plan_status = max(plan_jobs, key=lambda j: j.id).status
+
+
     return {
         "id": session.id,
         "user_id": session.user_id,
@@ -122,12 +149,14 @@ def get_interview_session(
         "score": session.score,
         "session_metadata": session.session_metadata,
         "questions": session.questions,
-        "improvement_plan": improvement_plan
+        "improvement_plan": improvement_plan,
+        "improvement_plan_status": improvement_plan_status
     }
 
 @router.post("/answer", response_model=interview_schema.Answer)
 def submit_answer(
     answer_in: interview_schema.AnswerCreate,
+    _slot: None = Depends(deps.evaluation_slot),
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
@@ -154,12 +183,26 @@ def submit_answer(
     db.commit()
     db.refresh(answer)
     
+    # Check the answer against facts stated earlier in this session.
+    # Only rows for the (kind, key) pairs this answer mentions are loaded.
+    facts = extract_facts(answer.user_audio_text, question.text)
+    contradictions = []
+    if facts:
+        fact_keys = {(f["kind"], f["key"]) for f in facts}
+        previous_facts = db.query(SessionFact).filter(
+            SessionFact.session_id == session.id,
+            SessionFact.kind.in_({k for k, _ in fact_keys}),
+            SessionFact.key.in_({k for _, k in fact_keys})
+        ).order_by(SessionFact.id).all()
+        contradictions = FactIndex(previous_facts).find_contradictions(facts)
+
     # Generate Feedback
     evaluation = ai_service.evaluate_answer(
         question.text, 
         answer.user_audio_text,
         stress_mode=answer_in.stress_mode,
-        personality=answer_in.officer_personality
+        personality=answer_in.officer_personality,
+        contradictions=contradictions
     )
     
     # Save Feedback
@@ -169,8 +212,11 @@ def submit_answer(
         score=evaluation["score"]
     )
     db.add(feedback)
+    for f in facts:
+        db.add(SessionFact(session_id=session.id, answer_id=answer.id, **f))
     db.commit()
     db.refresh(feedback)
+    answer_index.add(answer.id, question.text, feedback.score, current_user.id)
     
     answer.feedback = feedback
     return answer
@@ -205,13 +251,55 @@ def complete_interview(
         session.total_duration = int((session.end_time - start_time).total_seconds())
     
     # Calculate average score with safety
-    answers = db.query(Answer).join(Question).filter(Question.session_id == session.id).all()
-    scores = [a.feedback.score for a in answers if a.feedback and a.feedback.score is not None]
-    
-    if scores:
-        session.score = sum(scores) // len(scores)
-    else:
-        session.score = 0
+    session.score = average_feedback_score(db, session.id) or 0
     
     db.commit()
+    if session.status == "completed":
+        enqueue_improvement_plan(db, session)
     return {"status": "completed", "final_score": session.score}
+
+@router.get("/{session_id}/jobs", response_model=List[job_schema.Job])
+def get_session_jobs(
+    session_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Poll the background jobs queued for a session.
+    """
+    session = db.query(InterviewSession).filter(
+        InterviewSession.id == session_id,
+        InterviewSession.user_id == current_user.id
+    ).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Interview session not found")
+    return job_queue.jobs_for_session(session.id)
+
+@router.post("/{session_id}/rescore", response_model=job_schema.Job, status_code=status.HTTP_202_ACCEPTED)
+def rescore_interview(
+    session_id: int,
+    _slot: None = Depends(deps.evaluation_slot),
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Queue a re-evaluation of every answer in the session. A session has at
+    most one rescore job: while it is queued or running, further requests
+    return it. Repeating a request with the same Idempotency-Key returns the
+    original job instead of running it again.
+    """
+    session = db.query(InterviewSession).filter(
+        InterviewSession.id == session_id,
+        InterviewSession.user_id == current_user.id
+    ).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Interview session not found")
+    run_key = idempotency_key or uuid.uuid4().hex
+    return job_queue.enqueue(
+        "rescore_session",
+        f"rescore_session:{session.id}",
+        {"session_id": session.id, "run_key": run_key},
+        session_id=session.id,
+        rerun=True,
+    )
@@ -0,0 +1,99 @@
+import argparse
+import sys
+from datetime import timedelta
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.interview import InterviewSession, Question, Answer, Feedback
+from app.models.user import User
+from app.services.answer_index import answer_index
+from app.services.export_service import export_user_history
+from app.services.job_service import job_queue
+from app.services import session_service # Also registers background job handlers
+
+# Maintenance commands. Run from backend/: python -m app.cli <command> --help
+
+def export_history(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == args.email).first()
+        if not user:
+            print(f"User not found: {args.email}", file=sys.stderr)
+            return 1
+
+        out = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+        try:
+            for chunk in export_user_history(db, user.id, compress=args.gzip):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+    finally:
+        db.close()
+    return 0
+
+def run_jobs(args: argparse.Namespace) -> int:
+    count = job_queue.run_pending()
+    print(f"Ran {count} job(s)")
+    return 0
+
+def build_answer_index(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        rows = db.query(Answer.id, Question.text, Feedback.score, InterviewSession.user_id).join(
+            Question, Answer.question_id == Question.id
+        ).join(
+            InterviewSession, Question.session_id == InterviewSession.id
+        ).join(
+            Feedback, Feedback.answer_id == Answer.id
+        ).filter(
+            Feedback.score >= answer_index.min_score
+        ).execution_options(yield_per=5000)
+        count = answer_index.add_many(rows)
+        version = answer_index.save()
+    finally:
+        db.close()
+    print(f"Indexed {count} answer(s) into {answer_index.path} ({version})")
+    return 0
+
+def sweep_sessions(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        closed = session_service.sweep_stale_sessions(db, timedelta(minutes=args.idle_minutes), args.batch_size)
+    finally:
+        db.close()
+    print(f"Closed {closed} stale session(s)")
+    return 0
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="NeuroVisa maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export-history", help="Export a user's interview history as NDJSON")
+    export.add_argument("--email", required=True, help="Email of the user to export")
+    export.add_argument("--output", "-o", default="-", help="Output file (default: stdout)")
+    export.add_argument("--gzip", action="store_true", help="Gzip the output")
+    export.set_defaults(func=export_history)
+
+    jobs = commands.add_parser("run-jobs", help="Run every background job that is ready now (sqlite job queue)")
+    jobs.set_defaults(func=run_jobs)
+
+    index = commands.add_parser("build-answer-index", help="Index every high-scoring answer for improvement plans")
+    index.set_defaults(func=build_answer_index)
+
+    sweep = commands.add_parser("sweep-sessions", help="Mark sessions idle past the timeout as interrupted")
+    sweep.add_argument("--idle-minutes", type=int, default=settings.SESSION_IDLE_TIMEOUT_MINUTES)
+    sweep.add_argument("--batch-size", type=positive_int, default=settings.SESSION_SWEEP_BATCH_SIZE)
+    sweep.set_defaults(func=sweep_sessions)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
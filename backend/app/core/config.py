@@ -14,6 +14,36 @@ class Settings(BaseSettings):
     
     BACKEND_CORS_ORIGINS: List[str] = []
 
+    # Use SQLite for hackathon simplicity, can switch to postgres easily
+    DATABASE_URL: str = "sqlite:///./sql_app.db"
+
+    # Admission control for evaluation endpoints
+    ADMISSION_RATE_PER_SEC: float = 1.0 # Sustained requests per user
+    ADMISSION_BURST: int = 10 # Requests a user may make back-to-back
+    MAX_CONCURRENT_EVALUATIONS: int = 8
+    EVALUATION_QUEUE_SIZE: int = 32
+    EVALUATION_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
+    # Background jobs: "memory" for a single process, "sqlite" to share the queue across workers
+    JOB_QUEUE_BACKEND: str = "memory"
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_RETRY_BACKOFF_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_LEASE_SECONDS: float = 300.0 # sqlite queue: a running job is reclaimed once its lease runs out
+    JOB_RETENTION_SECONDS: float = 3600.0 # memory queue: how long finished jobs are kept
+
+    # Similarity index over high-scoring answers, used by improvement plans
+    ANSWER_INDEX_PATH: str = "./answer_index"
+    ANSWER_INDEX_DIM: int = 256
+    ANSWER_INDEX_MIN_SCORE: int = 80 # Answers at or above this score are indexed
+    ANSWER_INDEX_SAVE_INTERVAL_SECONDS: float = 30.0
+
+    # Sessions left in_progress longer than this are marked interrupted
+    SESSION_IDLE_TIMEOUT_MINUTES: int = 120
+    SESSION_SWEEP_INTERVAL_SECONDS: float = 300.0
+    SESSION_SWEEP_BATCH_SIZE: int = 5000
+
     model_config = {
         "case_sensitive": True,
         "env_file": ".env",
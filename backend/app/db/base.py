@@ -1,3 +1,4 @@
 from app.db.session import Base
 from app.models.user import User
-from app.models.interview import InterviewSession, Question, Answer, Feedback
+from app.models.interview import InterviewSession, Question, Answer, Feedback, SessionFact
+from app.models.job import BackgroundJob
@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
@@ -5,13 +8,37 @@ from app.api.api import api_router
 
 from app.db.session import engine
 from app.db.base import Base
+from app.services.job_service import job_queue
+from app.services.answer_index import answer_index, autosave
+from app.services.session_service import periodic_sweep
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+# create_all skips indexes on tables that already exist
+for table in ("interview_sessions", "questions", "answers", "feedback"):
+    for index in Base.metadata.tables[table].indexes:
+        index.create(bind=engine, checkfirst=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    index_saver = asyncio.create_task(autosave(answer_index, settings.ANSWER_INDEX_SAVE_INTERVAL_SECONDS))
+    sweeper = asyncio.create_task(periodic_sweep(
+        timedelta(minutes=settings.SESSION_IDLE_TIMEOUT_MINUTES),
+        settings.SESSION_SWEEP_INTERVAL_SECONDS,
+        settings.SESSION_SWEEP_BATCH_SIZE,
+    ))
+    yield
+    index_saver.cancel()
+    sweeper.cancel()
+    await job_queue.stop()
+    if answer_index.pending:
+        await asyncio.to_thread(answer_index.save)
 
 app = FastAPI(
     title="NeuroVisa API",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
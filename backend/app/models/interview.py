@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, JSON, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
 
 class InterviewSession(Base):
     __tablename__ = "interview_sessions"
+    __table_args__ = (
+        # Stale-session sweeps and per-user active session lookups
+        Index("ix_interview_sessions_status_start", "status", "start_time"),
+        Index("ix_interview_sessions_user_status", "user_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -17,12 +22,13 @@ class InterviewSession(Base):
 
     user = relationship("User", back_populates="interviews")
     questions = relationship("Question", back_populates="session")
+    facts = relationship("SessionFact", back_populates="session")
 
 class Question(Base):
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, ForeignKey("interview_sessions.id"))
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), index=True)
     text = Column(String, nullable=False)
     order = Column(Integer, nullable=False)
     
@@ -33,7 +39,7 @@ class Answer(Base):
     __tablename__ = "answers"
 
     id = Column(Integer, primary_key=True, index=True)
-    question_id = Column(Integer, ForeignKey("questions.id"))
+    question_id = Column(Integer, ForeignKey("questions.id"), index=True)
     user_audio_text = Column(Text, nullable=True) # The transcribed text
     response_time_ms = Column(Integer, nullable=True) # Time taken to answer
     edit_count = Column(Integer, default=0) # Number of edits made to text
@@ -45,8 +51,25 @@ class Feedback(Base):
     __tablename__ = "feedback"
     
     id = Column(Integer, primary_key=True, index=True)
-    answer_id = Column(Integer, ForeignKey("answers.id"))
+    answer_id = Column(Integer, ForeignKey("answers.id"), index=True)
     evaluation_json = Column(JSON, nullable=True) # Full evaluation data
     score = Column(Integer, nullable=True) # Specific score for this answer
 
     answer = relationship("Answer", back_populates="feedback")
+
+class SessionFact(Base):
+    __tablename__ = "session_facts"
+    __table_args__ = (
+        Index("ix_session_facts_session_key", "session_id", "kind", "key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("interview_sessions.id"), nullable=False)
+    answer_id = Column(Integer, ForeignKey("answers.id"), nullable=False)
+    kind = Column(String, nullable=False) # duration, amount, sponsor, institution
+    key = Column(String, nullable=False) # What the fact is about, e.g. stay, tuition, employer
+    value = Column(String, nullable=False) # Normalized value used for comparison
+    numeric_value = Column(Float, nullable=True) # Days for durations, units for amounts
+    source_text = Column(String, nullable=True) # Fragment of the answer the fact came from
+
+    session = relationship("InterviewSession", back_populates="facts")
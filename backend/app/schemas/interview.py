@@ -31,7 +31,7 @@ class AnswerCreate(AnswerBase):
 class Answer(AnswerBase):
     id: int
     question_id: int
-    feedback: Optional[Any] = None
+    feedback: Optional["Feedback"] = None
 
     class Config:
         orm_mode = True
@@ -48,6 +48,8 @@ class Feedback(FeedbackBase):
     class Config:
         orm_mode = True
 
+Answer.model_rebuild()
+
 # Session Schemas
 class InterviewSessionBase(BaseModel):
     pass
@@ -66,6 +68,7 @@ class InterviewSession(InterviewSessionBase):
     session_metadata: Optional[Any] = None
     questions: List[Question] = []
     improvement_plan: Optional[Any] = None
+    improvement_plan_status: Optional[str] = None # Job state while the plan is missing: queued, running, failed
 
     class Config:
         orm_mode = True
@@ -0,0 +1,20 @@
+from typing import Any, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    idempotency_key: str
+    session_id: Optional[int] = None
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    result: Optional[Any] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = {
+        "from_attributes": True
+    }
@@ -0,0 +1,174 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict
+
+from app.core.config import settings
+
+# In-process admission control for the evaluation endpoints.
+# Per-user token buckets stop a single client from hammering the API, and a
+# global slot pool with a bounded wait queue keeps the threadpool and DB from
+# being saturated when many users evaluate at once.
+#
+# Waiting happens on the event loop (one future per queued request), never in
+# a worker thread, so queued requests do not take threadpool capacity away
+# from everything else. A released slot is handed directly to the oldest waiter.
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """
+        Consume one token. Returns 0 on success, otherwise seconds until one is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class AdmissionController:
+    def __init__(
+        self,
+        rate_per_sec: float,
+        burst: int,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        max_tracked_users: int = 10000,
+    ):
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_tracked_users = max_tracked_users
+
+        self._lock = threading.Lock()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._active = 0
+
+        # Metrics
+        self._admitted = 0
+        self._rejected_rate_limited = 0
+        self._rejected_queue_full = 0
+        self._rejected_queue_timeout = 0
+        self._max_queue_depth_seen = 0
+
+    def _check_rate(self, user_id: str) -> None:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_tracked_users:
+                # Drop buckets that have fully refilled; they carry no state
+                now = time.monotonic()
+                self._buckets = {
+                    uid: b for uid, b in self._buckets.items()
+                    if b.tokens + (now - b.updated) * b.rate < b.capacity
+                }
+            bucket = TokenBucket(self.rate_per_sec, self.burst)
+            self._buckets[user_id] = bucket
+
+        wait = bucket.take()
+        if wait > 0:
+            self._rejected_rate_limited += 1
+            raise AdmissionRejected("Rate limit exceeded", wait)
+
+    async def acquire(self, user_id: str) -> None:
+        """
+        Admit one evaluation for the user or raise AdmissionRejected.
+        Waits on the event loop for at most queue_timeout seconds for a slot.
+        """
+        with self._lock:
+            self._check_rate(user_id)
+
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                self._admitted += 1
+                return
+
+            if len(self._waiters) >= self.max_queue:
+                self._rejected_queue_full += 1
+                raise AdmissionRejected("Evaluation queue is full", self.queue_timeout)
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self._max_queue_depth_seen = max(self._max_queue_depth_seen, len(self._waiters))
+
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except BaseException:
+            # Cancelled (e.g. client went away): give back a slot handed to us meanwhile
+            self._abandon(waiter)
+            raise
+
+        with self._lock:
+            if waiter.done():
+                self._admitted += 1
+                return
+            self._rejected_queue_timeout += 1
+        self._abandon(waiter)
+        raise AdmissionRejected("Timed out waiting for an evaluation slot", self.queue_timeout)
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        with self._lock:
+            if not waiter.done():
+                self._waiters.remove(waiter)
+                waiter.cancel()
+                return
+        if not waiter.cancelled():
+            self.release()
+
+    def release(self) -> None:
+        """
+        Hand the slot to the oldest waiter, or free it. Must run on the event loop.
+        """
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(True)
+                    return
+            self._active -= 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "active_evaluations": self._active,
+                "queue_depth": len(self._waiters),
+                "max_queue_depth_seen": self._max_queue_depth_seen,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "admitted": self._admitted,
+                "rejected": {
+                    "rate_limited": self._rejected_rate_limited,
+                    "queue_full": self._rejected_queue_full,
+                    "queue_timeout": self._rejected_queue_timeout,
+                },
+                "tracked_users": len(self._buckets),
+            }
+
+def retry_after_header(retry_after: float) -> str:
+    return str(max(1, math.ceil(retry_after)))
+
+admission_controller = AdmissionController(
+    rate_per_sec=settings.ADMISSION_RATE_PER_SEC,
+    burst=settings.ADMISSION_BURST,
+    max_concurrent=settings.MAX_CONCURRENT_EVALUATIONS,
+    max_queue=settings.EVALUATION_QUEUE_SIZE,
+    queue_timeout=settings.EVALUATION_QUEUE_TIMEOUT_SECONDS,
+)
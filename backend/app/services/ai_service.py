@@ -44,10 +44,11 @@ class AIService:
         selected = random.sample(questions_pool, min(5, len(questions_pool)))
         return [{"text": q, "order": i+1} for i, q in enumerate(selected)]
 
-    def evaluate_answer(self, question_text: str, answer_text: str, stress_mode: bool = False, personality: str = "Neutral") -> dict:
+    def evaluate_answer(self, question_text: str, answer_text: str, stress_mode: bool = False, personality: str = "Neutral", contradictions: list = None) -> dict:
         """
         Sophisticated heuristic-based evaluation simulating advanced AI analysis.
         Tracks: Red flags, confidence, clarity, and specific risks.
+        `contradictions` are conflicts with facts stated earlier in the session.
         """
         words = answer_text.lower().split()
         word_count = len(words)
@@ -68,6 +69,15 @@ class AIService:
                 if trigger in answer_text.lower():
                     red_flags.append(category)
                     risky_sentences.append(f"Detected potential {category.replace('_', ' ')}: '{trigger}'")
+
+        # Cross-answer consistency: surface contradictions first so they are not truncated
+        contradictions = contradictions or []
+        if contradictions:
+            red_flags.append("inconsistency")
+            risky_sentences = [
+                f"Inconsistent {c['key'].split('_')[0]}: now '{c['value']}', previously '{c['previous_value']}'"
+                for c in contradictions
+            ] + risky_sentences
         
         # 2. Confidence/Clarity Analysis
         hesitations = answer_text.lower().count(" maybe") + answer_text.lower().count(" i think") + answer_text.lower().count(" um") + answer_text.lower().count(" uh")
@@ -105,7 +115,10 @@ class AIService:
         # 5. Follow-up Question Generation (Adaptive Logic)
         follow_up = None
         if final_score < 70 or red_flags:
-            if "immigrant_intent" in red_flags or final_score < 50:
+            if "inconsistency" in red_flags:
+                c = contradictions[0]
+                follow_up = f"Earlier you said '{c['previous_value']}', but now '{c['value']}'. Which one is correct?"
+            elif "immigrant_intent" in red_flags or final_score < 50:
                 follow_up = "I see. To be clear, do you have specific commitments or property in your home country that require your return?"
             elif "financial_risk" in red_flags:
                 follow_up = "Thank you. Could you elaborate on how exactly you'll be accessing those funds while abroad?"
@@ -122,12 +135,16 @@ class AIService:
             "score": final_score,
             "feedback": feedback,
             "follow_up": follow_up,
+            # Interview settings the answer was scored under, reused when re-scoring
+            "stress_mode": stress_mode,
+            "personality": personality,
             "metrics": {
                 "clarity": "High" if word_count > 20 else ("Medium" if word_count > 10 else "Low"),
                 "confidence": "High" if confidence_score > 75 else ("Medium" if confidence_score > 45 else "Low"),
                 "risk_level": "High" if red_flags or final_score < 50 else ("Medium" if final_score < 75 else "Low"),
                 "red_flags": list(set(red_flags)),
                 "risky_sentences": risky_sentences[:2],
+                "contradictions": contradictions,
                 "word_count": word_count,
                 "tone": "Supportive" if confidence_score < 50 else "Direct"
             }
@@ -136,20 +153,32 @@ class AIService:
     def generate_improvement_plan(self, session_data: dict) -> dict:
         """
         Analyzes session history and generates a targeted improvement plan.
+        `weak_answers` may carry `examples`: the user's own high-scoring earlier
+        answers to similar questions. Without them the plan falls back to
+        generic examples.
         """
         # Heuristic: Find lowest scoring answers
         weaknesses = []
         recommendations = []
         
         # Simple analysis
-        score = session_data.get("score", 0)
+        score = session_data.get("score") or 0
         if score < 70:
             weaknesses.append("Foundational Trust: Some answers lacked concrete evidentiary ties.")
+
+        improved_answers = []
+        for weak in session_data.get("weak_answers", []):
+            for example in weak.get("examples", []):
+                improved_answers.append({
+                    "question": weak["question"],
+                    "original": weak["answer"],
+                    "improved": example["text"]
+                })
         
         # Examples
         return {
             "top_weaknesses": weaknesses or ["None detected! Your profile is strong."],
-            "improved_answers": [
+            "improved_answers": improved_answers or [
                 {"original": "I just want to visit.", "improved": "I am traveling to attend my sister's graduation and explore the national parks for 12 days."},
                 {"original": "My dad pays.", "improved": "My father, who is a Senior Architect at [Company], is sponsoring my trip with an allocated budget of $8,000."}
             ],
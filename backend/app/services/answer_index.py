@@ -0,0 +1,287 @@
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError: # Windows: saves from a single worker only
+    fcntl = None
+
+from app.core.config import settings
+
+# Similarity index over a user's own high-scoring earlier answers.
+# Questions are embedded as L2-normalized hashed word 1-2 gram vectors. Each
+# distinct question text gets one row in a (questions x dim) matrix and is
+# vectorized once. Answers are kept sorted by user with an offsets array, so a
+# lookup is a slice of the user's answers plus a mat-vec over their questions.
+# Lookups never return other users' answers: they are verbatim transcripts
+# that can name employers, amounts and family members.
+#
+# On disk the index is a versioned directory of .npy files that workers open
+# with mmap_mode="r", so they share pages instead of each loading a copy.
+# New answers go to an in-memory tail and are merged into a new version on save().
+
+ANSWER_DTYPE = np.dtype([("answer_id", "<i8"), ("user_id", "<i8"), ("question_row", "<i4"), ("score", "<i2")])
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+def _question_key(text: str) -> int:
+    normalized = " ".join(TOKEN_RE.findall(text.lower()))
+    return int.from_bytes(hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+def vectorize(text: str, dim: int) -> np.ndarray:
+    """
+    Hashed word unigram + bigram vector with sublinear term frequency.
+    """
+    tokens = TOKEN_RE.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    vec = np.zeros(dim, dtype=np.float32)
+    for feature in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vec[(h >> 1) % dim] += 1.0 if h & 1 else -1.0
+    np.copysign(np.log1p(np.abs(vec)), vec, out=vec)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+class AnswerIndex:
+    def __init__(self, path: str, dim: int = 256, min_score: int = 80, min_similarity: float = 0.5):
+        self.path = path
+        self.dim = dim
+        self.min_score = min_score
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._version = None
+        self._questions = np.zeros((0, dim), dtype=np.float32)
+        self._question_keys = np.zeros(0, dtype=np.int64)
+        self._answers = np.zeros(0, dtype=ANSWER_DTYPE)
+        self._users = np.zeros(0, dtype=np.int64)
+        self._user_offsets = np.zeros(1, dtype=np.int64)
+        self._key_to_row: Dict[int, int] = {}
+        # Unsaved changes: answer_id -> (question_key, user_id, score), all None for a removal
+        self._tail = {}
+        # One vector per distinct question referenced by the tail
+        self._tail_vectors: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._answers) + len(self._tail)
+
+    @property
+    def pending(self) -> int:
+        return len(self._tail)
+
+    # Persistence
+
+    def _current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, "CURRENT")) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _load_version(self, version: str) -> None:
+        vdir = os.path.join(self.path, version)
+        self._questions = np.load(os.path.join(vdir, "questions.npy"), mmap_mode="r")
+        self._question_keys = np.load(os.path.join(vdir, "question_keys.npy"), mmap_mode="r")
+        self._answers = np.load(os.path.join(vdir, "answers.npy"), mmap_mode="r")
+        self._users = np.load(os.path.join(vdir, "users.npy"), mmap_mode="r")
+        self._user_offsets = np.load(os.path.join(vdir, "user_offsets.npy"), mmap_mode="r")
+        self._key_to_row = dict(zip(self._question_keys.tolist(), range(len(self._question_keys))))
+        self._version = version
+
+    def refresh(self) -> None:
+        """
+        Pick up a version saved by another worker. Costs one small file read.
+        """
+        version = self._current_version()
+        if version and version != self._version:
+            with self._lock:
+                self._load_version(version)
+
+    def save(self) -> Optional[str]:
+        """
+        Merge the tail into a new on-disk version and switch CURRENT to it.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, ".lock"), "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            with self._lock:
+                # Merge on top of whatever another worker saved last
+                version = self._current_version()
+                if version and version != self._version:
+                    self._load_version(version)
+                if not self._tail:
+                    return self._version
+
+                questions, keys, answers = self._merge_tail()
+                answers = answers[np.lexsort((answers["question_row"], answers["user_id"]))]
+                users, starts = np.unique(answers["user_id"], return_index=True)
+                user_offsets = np.append(starts, len(answers)).astype(np.int64)
+
+                new_version = f"v{int(self._version[1:]) + 1 if self._version else 1}"
+                vdir = os.path.join(self.path, new_version)
+                shutil.rmtree(vdir, ignore_errors=True)
+                os.makedirs(vdir)
+                np.save(os.path.join(vdir, "questions.npy"), questions)
+                np.save(os.path.join(vdir, "question_keys.npy"), keys)
+                np.save(os.path.join(vdir, "answers.npy"), answers)
+                np.save(os.path.join(vdir, "users.npy"), users)
+                np.save(os.path.join(vdir, "user_offsets.npy"), user_offsets)
+
+                tmp = os.path.join(self.path, "CURRENT.tmp")
+                with open(tmp, "w") as f:
+                    f.write(new_version)
+                os.replace(tmp, os.path.join(self.path, "CURRENT"))
+
+                # Open readers keep their mapping of the old files alive, so only
+                # versions older than the previous one are removed
+                for name in os.listdir(self.path):
+                    if name.startswith("v") and name not in (new_version, self._version):
+                        shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+                self._load_version(new_version)
+                self._tail = {}
+                self._tail_vectors = {}
+                return new_version
+
+    def _merge_tail(self):
+        key_to_row = dict(self._key_to_row)
+        new_vectors = []
+        rows, answer_ids, user_ids, scores = [], [], [], []
+        for answer_id, (qkey, user_id, score) in self._tail.items():
+            if score is None:
+                continue
+            row = key_to_row.get(qkey)
+            if row is None:
+                row = len(key_to_row)
+                key_to_row[qkey] = row
+                new_vectors.append(self._tail_vectors[qkey])
+            rows.append(row)
+            answer_ids.append(answer_id)
+            user_ids.append(user_id)
+            scores.append(score)
+
+        questions = np.concatenate([self._questions, np.array(new_vectors, dtype=np.float32).reshape(-1, self.dim)])
+        keys = np.array(list(key_to_row), dtype=np.int64)
+
+        # Drop base entries that the tail replaces or removes
+        kept = self._answers[~np.isin(self._answers["answer_id"], np.fromiter(self._tail, dtype=np.int64))]
+        added = np.empty(len(answer_ids), dtype=ANSWER_DTYPE)
+        added["answer_id"], added["user_id"], added["question_row"], added["score"] = answer_ids, user_ids, rows, scores
+        return questions, keys, np.concatenate([kept, added])
+
+    # Updates and queries
+
+    def _question_vector(self, qkey: int, question_text: str) -> None:
+        # Caller holds the lock. Indexed questions reuse their stored row.
+        if qkey not in self._tail_vectors:
+            row = self._key_to_row.get(qkey)
+            self._tail_vectors[qkey] = (
+                np.array(self._questions[row]) if row is not None else vectorize(question_text, self.dim)
+            )
+
+    def add(self, answer_id: int, question_text: str, score: int, user_id: int) -> None:
+        """
+        Record an answer's latest score. Answers below min_score are ignored.
+        """
+        if score is None or score < self.min_score:
+            return
+        qkey = _question_key(question_text)
+        with self._lock:
+            self._question_vector(qkey, question_text)
+            self._tail[answer_id] = (qkey, user_id, int(score))
+
+    def remove(self, answer_id: int) -> None:
+        """
+        Drop an answer, e.g. after re-scoring pushed it below min_score.
+        """
+        with self._lock:
+            self._tail[answer_id] = (None, None, None)
+
+    def add_many(self, rows: Iterable) -> int:
+        """
+        Bulk add (answer_id, question_text, score, user_id) rows. Each distinct
+        question text is hashed and vectorized once.
+        """
+        keys = {}
+        count = 0
+        for answer_id, question_text, score, user_id in rows:
+            count += 1
+            if score is None or score < self.min_score:
+                continue
+            qkey = keys.get(question_text)
+            with self._lock:
+                if qkey is None:
+                    qkey = keys[question_text] = _question_key(question_text)
+                    self._question_vector(qkey, question_text)
+                self._tail[answer_id] = (qkey, user_id, int(score))
+        return count
+
+    def query(self, question_text: str, user_id: int, k: int = 3, exclude_answer_ids: Iterable[int] = ()) -> List[dict]:
+        """
+        Top-k of the user's own answers to the same or similar questions, ranked
+        by similarity * score. Returns dicts with answer_id, score and similarity.
+        """
+        self.refresh()
+        qvec = vectorize(question_text, self.dim)
+        exclude = set(exclude_answer_ids)
+        with self._lock:
+            questions, answers, users, user_offsets = self._questions, self._answers, self._users, self._user_offsets
+            tail, tail_vectors = dict(self._tail), dict(self._tail_vectors)
+
+        i = int(np.searchsorted(users, user_id))
+        chunk = answers[user_offsets[i]:user_offsets[i + 1]] if i < len(users) and users[i] == user_id else answers[:0]
+        # Unsaved updates and caller exclusions override the on-disk copy
+        drop = np.fromiter(set(tail) | exclude, dtype=np.int64)
+        if len(drop) and len(chunk):
+            chunk = chunk[~np.isin(chunk["answer_id"], drop)]
+        chunk_sims = np.asarray(questions)[chunk["question_row"]] @ qvec if len(chunk) else np.zeros(0, dtype=np.float32)
+        similar = chunk_sims >= self.min_similarity
+        ids, scores, sims = [chunk["answer_id"][similar]], [chunk["score"][similar]], [chunk_sims[similar]]
+
+        tail_sims = {}
+        for answer_id, (qkey, owner, score) in tail.items():
+            if score is None or owner != user_id or answer_id in exclude:
+                continue
+            if qkey not in tail_sims:
+                tail_sims[qkey] = float(tail_vectors[qkey] @ qvec)
+            if tail_sims[qkey] >= self.min_similarity:
+                ids.append(np.array([answer_id], dtype=np.int64))
+                scores.append(np.array([score], dtype=np.int16))
+                sims.append(np.array([tail_sims[qkey]], dtype=np.float32))
+
+        ids, scores, sims = np.concatenate(ids), np.concatenate(scores), np.concatenate(sims)
+        if not len(ids):
+            return []
+
+        relevance = sims * scores.astype(np.float32)
+        if len(relevance) > k:
+            top = np.argpartition(-relevance, k)[:k]
+        else:
+            top = np.arange(len(relevance))
+        top = top[np.argsort(-relevance[top])]
+        return [
+            {"answer_id": int(ids[i]), "score": int(scores[i]), "similarity": round(float(sims[i]), 3)}
+            for i in top
+        ]
+
+async def autosave(index: AnswerIndex, interval: float) -> None:
+    """
+    Lifespan task: periodically persist unsaved additions.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if index.pending:
+            await asyncio.to_thread(index.save)
+
+answer_index = AnswerIndex(
+    settings.ANSWER_INDEX_PATH,
+    dim=settings.ANSWER_INDEX_DIM,
+    min_score=settings.ANSWER_INDEX_MIN_SCORE,
+)
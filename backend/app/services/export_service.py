@@ -0,0 +1,114 @@
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.interview import InterviewSession, Question, Answer, Feedback
+
+# Streaming export of a user's interview history as NDJSON.
+# Sessions are read through a server-side cursor in yield_per batches and
+# only plain columns are selected, so no ORM graphs pile up in the identity
+# map. Memory stays bounded by the batch size, not the number of sessions.
+
+EXPORT_BATCH_SIZE = 500
+
+SESSION_COLUMNS = (
+    InterviewSession.id,
+    InterviewSession.start_time,
+    InterviewSession.end_time,
+    InterviewSession.total_duration,
+    InterviewSession.status,
+    InterviewSession.score,
+    InterviewSession.session_metadata,
+)
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _questions_for_batch(db: Session, session_ids: List[int]) -> dict:
+    rows = db.execute(
+        select(
+            Question.session_id,
+            Question.id,
+            Question.text,
+            Question.order,
+            Answer.id,
+            Answer.user_audio_text,
+            Answer.response_time_ms,
+            Answer.edit_count,
+            Feedback.score,
+            Feedback.evaluation_json,
+        )
+        .outerjoin(Answer, Answer.question_id == Question.id)
+        .outerjoin(Feedback, Feedback.answer_id == Answer.id)
+        .where(Question.session_id.in_(session_ids))
+        .order_by(Question.session_id, Question.order)
+    )
+
+    by_session = {}
+    for (session_id, q_id, q_text, q_order, a_id, a_text, a_time, a_edits, f_score, f_eval) in rows:
+        answer = None
+        if a_id is not None:
+            answer = {
+                "id": a_id,
+                "user_audio_text": a_text,
+                "response_time_ms": a_time,
+                "edit_count": a_edits,
+                "feedback": None if f_score is None and f_eval is None else {
+                    "score": f_score,
+                    "evaluation": f_eval,
+                },
+            }
+        by_session.setdefault(session_id, []).append({
+            "id": q_id,
+            "text": q_text,
+            "order": q_order,
+            "answer": answer,
+        })
+    return by_session
+
+def iter_user_history(db: Session, user_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    Yields one dict per session, oldest first, with nested questions, answers and feedback.
+    """
+    result = db.execute(
+        select(*SESSION_COLUMNS)
+        .where(InterviewSession.user_id == user_id)
+        .order_by(InterviewSession.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    for partition in result.partitions():
+        questions = _questions_for_batch(db, [row.id for row in partition])
+        for row in partition:
+            yield {
+                "id": row.id,
+                "start_time": _isoformat(row.start_time),
+                "end_time": _isoformat(row.end_time),
+                "total_duration": row.total_duration,
+                "status": row.status,
+                "score": row.score,
+                "session_metadata": row.session_metadata,
+                "questions": questions.get(row.id, []),
+            }
+
+def iter_ndjson(records: Iterable[dict]) -> Iterator[bytes]:
+    for record in records:
+        yield (json.dumps(record, default=str) + "\n").encode("utf-8")
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Compresses a byte stream on the fly into a single gzip member.
+    """
+    compressor = zlib.compressobj(wbits=31) # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_user_history(db: Session, user_id: int, compress: bool = False) -> Iterator[bytes]:
+    stream = iter_ndjson(iter_user_history(db, user_id))
+    return gzip_stream(stream) if compress else stream
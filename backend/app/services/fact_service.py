@@ -0,0 +1,232 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Structured fact extraction for cross-answer consistency checks.
+# Each answer is reduced to a handful of normalized facts (stay duration,
+# amounts, sponsor, institution/employer) when it is submitted. New answers are
+# compared against the stored facts for the same (kind, key) only, so a check
+# costs O(facts) instead of re-reading every earlier answer.
+# Sponsors and universities can hold several values at once, so a new value is
+# not a conflict by itself; only an explicit negation or replacement ("not my
+# parents", "instead of X", "I no longer work at X") contradicts an earlier claim.
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "fifteen": 15, "twenty": 20, "thirty": 30,
+}
+UNIT_DAYS = {"day": 1, "week": 7, "month": 30, "year": 365}
+CURRENCIES = {
+    "$": "usd", "usd": "usd", "dollars": "usd", "inr": "inr", "rs": "inr", "rs.": "inr", "rupees": "inr",
+    "€": "eur", "eur": "eur", "euros": "eur", "£": "gbp", "gbp": "gbp", "pounds": "gbp",
+}
+MULTIPLIERS = {"k": 1_000, "thousand": 1_000, "lakh": 100_000, "lakhs": 100_000, "million": 1_000_000}
+
+STAY_VERBS = r"(?:stay|staying|visit|visiting|remain|remaining|travel|travelling|traveling|trip|vacation|holiday)"
+STAY_QUESTION_RE = re.compile(r"\bhow long\b.*\b(?:stay|visit|remain|trip)", re.IGNORECASE)
+NEGATION_RE = re.compile(r"\b(?:not|no|never|didn't|don't|doesn't|won't|wasn't|isn't|aren't|cannot|can't|without)\b")
+CLAUSE_RE = re.compile(r",|\bbut\b|\bso\b|\bhowever\b|\bthough\b")
+# A negation governs a claim when it ends at most three words before it ("was not
+# admitted to X"), unless an exception word flips it back ("did not apply anywhere except X")
+NEGATED_BEFORE_RE = re.compile(
+    r"\b(?:not|never|no longer|instead of|rather than|didn't|don't|doesn't|won't|wasn't|isn't|aren't)"
+    r"(?:\s+(?!except\b|only\b|besides\b|but\b)[\w']+){0,3}?\s*$",
+    re.IGNORECASE,
+)
+# Prefix marking a fact the answer denies, e.g. "not parents"
+NEGATED = "not "
+AMOUNT_LABELS = {
+    "tuition": ("tuition", "fees"),
+    "salary": ("salary", "income", "earn", "paid"),
+    "funds": ("budget", "savings", "saved", "funds", "bank", "sponsor", "allocated"),
+}
+SPONSOR_ALIASES = {
+    "father": "parents", "dad": "parents", "mother": "parents", "mom": "parents",
+    "parents": "parents", "parent": "parents", "family": "parents",
+    "uncle": "relative", "aunt": "relative", "brother": "relative", "sister": "relative",
+    "cousin": "relative", "husband": "spouse", "wife": "spouse", "spouse": "spouse",
+    "employer": "employer", "company": "employer", "scholarship": "scholarship",
+    "university": "scholarship", "government": "government", "myself": "self", "self": "self",
+}
+
+# Two numeric facts are contradictory when the larger exceeds the smaller by this ratio
+NUMERIC_TOLERANCE = 1.5
+
+_number = r"\b(\d+(?:\.\d+)?|" + "|".join(NUMBER_WORDS) + r")"
+_duration = _number + r"[\s-]*(day|week|month|year)s?\b"
+DURATION_RE = re.compile(_duration)
+# A duration only counts as the stay when a stay word governs it: "stay (in the
+# country) for two weeks" or "a two-week trip". Up to four plain words may sit in
+# between, but no comma or relative clause ("visit my sister, who has lived ...").
+STAY_DURATION_RES = [
+    re.compile(r"\b" + STAY_VERBS + r"\b(?:\s+(?!who\b|which\b|that\b|where\b|since\b)[a-z']+){0,4}?\s+for\s+(?:about\s+|around\s+|only\s+|just\s+|roughly\s+)?" + _duration),
+    re.compile(_duration + r"[\s-]+(?:long\s+)?(?:stay|visit|trip|vacation|holiday)\b"),
+]
+AMOUNT_RE = re.compile(
+    r"(?:(\$|usd|inr|rs\.?|€|eur|£|gbp)\s?)?(\d[\d,]*(?:\.\d+)?)\s*(k|thousand|lakhs?|million)?\b\s*(dollars|usd|rupees|inr|euros|eur|pounds|gbp)?"
+)
+SPONSOR_RES = [
+    re.compile(r"\b(?:funded|sponsored|paid|covered|financed)\s+by\s+(?:my\s+|the\s+|a\s+)?(\w+)"),
+    re.compile(r"\b(?:my\s+)?(\w+)\s+(?:is|are|will|isn't|aren't|won't)(?:\s+not|\s+no longer)?(?:\s+be)?\s+(?:paying|funding|sponsoring|covering|pay|fund|sponsor|cover)\b"),
+    re.compile(r"\b(?:my\s+)?(\w+)\s+(?:pays|funds|sponsors|covers|(?:doesn't|does not|no longer)\s+(?:pay|fund|sponsor|cover)s?)\b"),
+    re.compile(r"\b(?:on|with|received|got|won|awarded|have|has|had|(?:didn't|did not|don't|do not)\s+(?:get|receive))\s+(?:a\s+|an\s+|the\s+|any\s+|full\s+|partial\s+)*(scholarship)\b"),
+    re.compile(r"\b(scholarship)\s+(?:covers|pays|funds|will cover|will pay|is covering|is paying)\b"),
+    re.compile(r"\b(?:i\s+(?:am|will be|will)\s+(?:paying|funding|pay|fund)\s+(?:for\s+)?(?:it\s+|this\s+)?)(myself)\b"),
+    re.compile(r"\b(self)[\s-]funded\b"),
+]
+# "my uncle is paying instead of my parents" also denies the parents
+REPLACED_SPONSOR_RE = re.compile(r"\b(?:instead of|rather than|not|no longer)\s+(?:by\s+)?(?:my\s+|the\s+|a\s+)?(\w+)\b(?!')")
+_name = r"([A-Z][\w&.'-]*(?:\s+(?:of\s+)?[A-Z][\w&.'-]*)*)"
+UNIVERSITY_RE = re.compile(r"\b(University of [A-Z][\w-]*(?:\s+[A-Z][\w-]*)*|" + r"(?:[A-Z][\w&.'-]*\s+)+(?:University|College|Institute))")
+_role = r"(?:[a-z]+\s+){0,2}(?:engineer|manager|analyst|developer|consultant|designer|accountant|teacher|nurse|doctor|intern|employee|associate|architect|scientist|officer|director)"
+# Only the applicant's own job counts: "I work at X", "I am a developer at X", not "my father works at X"
+EMPLOYER_RES = [
+    re.compile(r"\b[Ii]\s+(?:(?:do not|don't|did not|didn't|no longer|never)\s+)?(?:work|worked|am working|have worked|used to work|am employed|was employed)\s+(?:at|for|with)\s+" + _name),
+    re.compile(r"\b[Ii](?:'m| am|'ve been| have been| was)(?:\s+not|\s+no longer)?\s+(?:a|an)\s+" + _role + r"\s+(?:at|for|with)\s+" + _name),
+    re.compile(r"\b[Ii]\s+(?:have|had)\s+a\s+job\s+(?:at|with)\s+" + _name),
+]
+# Leaving a job denies it: "I left Infosys", "I quit my job at Infosys"
+LEFT_EMPLOYER_RE = re.compile(r"\b[Ii]\s+(?:left|quit)\s+(?:my\s+job\s+(?:at|with)\s+)?" + _name)
+
+def _sentences(text: str) -> List[str]:
+    return [s.strip() for s in re.split(r"[.!?;\n]+", text) if s.strip()]
+
+def _to_number(token: str) -> float:
+    token = token.lower()
+    if token in NUMBER_WORDS:
+        return float(NUMBER_WORDS[token])
+    return float(token.replace(",", ""))
+
+def _amount_label(sentence: str, start: int, end: int) -> Optional[str]:
+    # Prefer the nearest label before the amount ("tuition is $40k"), then after it
+    before = sentence[max(0, start - 40):start]
+    positions = {l: max(before.rfind(w) for w in words) for l, words in AMOUNT_LABELS.items()}
+    label, pos = max(positions.items(), key=lambda item: item[1])
+    if pos >= 0:
+        return label
+    after = sentence[end:end + 20]
+    return next((l for l, words in AMOUNT_LABELS.items() if any(w in after for w in words)), None)
+
+def _negated(clause: str, m: re.Match) -> bool:
+    return bool(NEGATED_BEFORE_RE.search(clause[:m.start()]) or NEGATION_RE.search(m.group(0).lower()))
+
+def _fact(kind: str, key: str, value: str, numeric: Optional[float], source: str) -> dict:
+    return {"kind": kind, "key": key, "value": value, "numeric_value": numeric, "source_text": source[:200]}
+
+def extract_facts(answer_text: str, question_text: str = "") -> List[dict]:
+    """
+    Pulls normalized durations, amounts, sponsors and institutions out of an answer.
+    When the question asks how long the stay is, the first duration is the stay.
+    """
+    facts = []
+    seen = set()
+
+    def add(fact: dict) -> None:
+        ident = (fact["kind"], fact["key"], fact["value"])
+        if ident not in seen:
+            seen.add(ident)
+            facts.append(fact)
+
+    asks_stay = bool(STAY_QUESTION_RE.search(question_text or ""))
+    for sentence in _sentences(answer_text or ""):
+        lowered = sentence.lower()
+
+        m = next((m for m in (r.search(lowered) for r in STAY_DURATION_RES) if m), None)
+        if m is None and asks_stay and not any(f["kind"] == "duration" for f in facts):
+            m = DURATION_RE.search(lowered)
+        if m:
+            days = _to_number(m.group(1)) * UNIT_DAYS[m.group(2)]
+            add(_fact("duration", "stay", f"{int(days)} days", days, sentence))
+
+        for m in AMOUNT_RE.finditer(lowered):
+            currency = m.group(1) or m.group(4)
+            if not currency and not m.group(3):
+                continue # Bare numbers are usually years, ages or counts
+            amount = _to_number(m.group(2)) * MULTIPLIERS.get(m.group(3) or "", 1)
+            label = _amount_label(lowered, m.start(), m.end())
+            if label:
+                # Amounts are only comparable within the same currency
+                key = f"{label}_{CURRENCIES[currency]}" if currency else label
+                add(_fact("amount", key, f"{amount:g}", amount, sentence))
+
+        # Sponsors are read per clause so "did not get a scholarship" only denies the scholarship
+        for clause in CLAUSE_RE.split(lowered):
+            for pattern in SPONSOR_RES:
+                m = pattern.search(clause)
+                if m and m.group(1) in SPONSOR_ALIASES:
+                    prefix = NEGATED if _negated(clause, m) else ""
+                    add(_fact("sponsor", "sponsor", prefix + SPONSOR_ALIASES[m.group(1)], None, sentence))
+            for m in REPLACED_SPONSOR_RE.finditer(clause):
+                if m.group(1) in SPONSOR_ALIASES:
+                    add(_fact("sponsor", "sponsor", NEGATED + SPONSOR_ALIASES[m.group(1)], None, sentence))
+
+        for clause in CLAUSE_RE.split(sentence):
+            for m in UNIVERSITY_RE.finditer(clause):
+                prefix = NEGATED if NEGATED_BEFORE_RE.search(clause[:m.start()]) else ""
+                add(_fact("institution", "university", prefix + m.group(1).strip().lower(), None, sentence))
+
+            m = next((m for m in (r.search(clause) for r in EMPLOYER_RES) if m), None)
+            if m:
+                prefix = NEGATED if _negated(clause, m) else ""
+                add(_fact("institution", "employer", prefix + m.group(1).strip().lower(), None, sentence))
+            m = LEFT_EMPLOYER_RE.search(clause)
+            if m:
+                add(_fact("institution", "employer", NEGATED + m.group(1).strip().lower(), None, sentence))
+
+    return facts
+
+def _ratio(a: float, b: float) -> float:
+    low, high = min(a, b), max(a, b)
+    return high / low if low > 0 else float("inf")
+
+class FactIndex:
+    """
+    Session facts grouped by (kind, key) so a new fact is only compared with
+    earlier statements about the same thing.
+    """
+    def __init__(self, facts: Iterable = ()):
+        self._by_key: Dict[Tuple[str, str], List] = {}
+        for f in facts:
+            self.add(f)
+
+    @staticmethod
+    def _get(fact, attr):
+        return fact[attr] if isinstance(fact, dict) else getattr(fact, attr)
+
+    def add(self, fact) -> None:
+        k = (self._get(fact, "kind"), self._get(fact, "key"))
+        self._by_key.setdefault(k, []).append(fact)
+
+    def find_contradictions(self, new_facts: List[dict]) -> List[dict]:
+        contradictions = []
+        for fact in new_facts:
+            previous = self._by_key.get((fact["kind"], fact["key"]))
+            if not previous:
+                continue
+
+            if fact["numeric_value"] is not None:
+                # Compare with the closest earlier figure
+                value = fact["numeric_value"]
+                numeric = [p for p in previous if self._get(p, "numeric_value") is not None]
+                if not numeric:
+                    continue
+                compared = min(numeric, key=lambda p: _ratio(value, self._get(p, "numeric_value")))
+                consistent = _ratio(value, self._get(compared, "numeric_value")) <= NUMERIC_TOLERANCE
+            else:
+                # Categorical facts can hold several values; only the latest statement
+                # that asserts or denies this same value decides
+                value = fact["value"]
+                opposite = value[len(NEGATED):] if value.startswith(NEGATED) else NEGATED + value
+                compared = next((p for p in reversed(previous) if self._get(p, "value") in (value, opposite)), None)
+                if compared is None:
+                    continue
+                consistent = self._get(compared, "value") == value
+
+            if not consistent:
+                contradictions.append({
+                    "kind": fact["kind"],
+                    "key": fact["key"],
+                    "value": fact["value"],
+                    "previous_value": self._get(compared, "value"),
+                })
+        return contradictions
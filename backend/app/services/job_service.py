@@ -0,0 +1,369 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import BackgroundJob
+
+# Local background jobs for post-answer and post-session work.
+# Job state lives in a store: in memory for a single process, or in the
+# background_jobs table so several worker processes can share one queue.
+# Asyncio workers started in the app lifespan pull jobs from the store and
+# run the synchronous handlers in a thread, retrying failures with backoff.
+# Every job carries an idempotency key; enqueueing a key that is already
+# queued, running or done returns the existing job instead of a duplicate.
+# In the table store a running job holds a lease that its worker renews; a job
+# whose lease runs out (the worker died) is picked up again by another worker.
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running", "succeeded")
+FINISHED_STATUSES = ("succeeded", "failed")
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+class MemoryJob:
+    def __init__(self, id: int, kind: str, idempotency_key: str, session_id: Optional[int], payload: Any, max_attempts: int):
+        self.id = id
+        self.kind = kind
+        self.idempotency_key = idempotency_key
+        self.session_id = session_id
+        self.payload = payload
+        self.status = "queued"
+        self.attempts = 0
+        self.max_attempts = max_attempts
+        self.last_error = None
+        self.result = None
+        self.run_after = _now()
+        self.created_at = self.run_after
+        self.updated_at = self.run_after
+
+def _should_requeue(job, payload: Any, rerun: bool) -> bool:
+    if job.status not in ACTIVE_STATUSES:
+        return True
+    return rerun and job.status == "succeeded" and job.payload != payload
+
+class MemoryJobStore:
+    """
+    Process-local job store. Ready jobs sit in a heap ordered by run_after.
+    Finished jobs are kept for `retention` seconds, and at most `max_finished`
+    of them, so status polls and repeated enqueues still find them.
+    Jobs die with the process, so there are no leases.
+    """
+    lease = None
+
+    def __init__(self, retention: float = 3600.0, max_finished: int = 10_000):
+        self.retention = retention
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs: Dict[int, MemoryJob] = {}
+        self._by_key: Dict[str, int] = {}
+        self._ready: list = []
+        self._finished: Deque[Tuple[datetime, int]] = deque()
+
+    def _prune(self) -> None:
+        cutoff = _now() - timedelta(seconds=self.retention)
+        while self._finished and (self._finished[0][0] < cutoff or len(self._finished) > self.max_finished):
+            finished_at, job_id = self._finished.popleft()
+            job = self._jobs.get(job_id)
+            # Skip jobs that were queued again since this entry was recorded
+            if job is None or job.status not in FINISHED_STATUSES or job.updated_at != finished_at:
+                continue
+            del self._jobs[job_id]
+            if self._by_key.get(job.idempotency_key) == job_id:
+                del self._by_key[job.idempotency_key]
+
+    def _finish(self, job: MemoryJob) -> None:
+        self._finished.append((job.updated_at, job.id))
+        self._prune()
+
+    def enqueue(self, kind: str, idempotency_key: str, payload: Any, session_id: Optional[int], max_attempts: int, rerun: bool = False) -> MemoryJob:
+        with self._lock:
+            self._prune()
+            existing = self._jobs.get(self._by_key.get(idempotency_key))
+            if existing and not _should_requeue(existing, payload, rerun):
+                return existing
+            if existing:
+                job = existing
+                job.status, job.attempts, job.last_error, job.run_after = "queued", 0, None, _now()
+                job.payload, job.updated_at = payload, job.run_after
+            else:
+                job = MemoryJob(next(self._ids), kind, idempotency_key, session_id, payload, max_attempts)
+                self._jobs[job.id] = job
+                self._by_key[idempotency_key] = job.id
+            heapq.heappush(self._ready, (job.run_after, job.id))
+            return job
+
+    def claim_next(self) -> Optional[MemoryJob]:
+        with self._lock:
+            now = _now()
+            while self._ready and self._ready[0][0] <= now:
+                _, job_id = heapq.heappop(self._ready)
+                job = self._jobs[job_id]
+                if job.status == "queued":
+                    job.status = "running"
+                    job.attempts += 1
+                    job.updated_at = now
+                    return job
+            return None
+
+    def extend_lease(self, job) -> None:
+        pass
+
+    def mark_succeeded(self, job, result: Any) -> None:
+        with self._lock:
+            job = self._jobs[job.id]
+            job.status, job.result, job.last_error, job.updated_at = "succeeded", result, None, _now()
+            self._finish(job)
+
+    def mark_failed(self, job, error: str, retry_at: Optional[datetime]) -> None:
+        with self._lock:
+            job = self._jobs[job.id]
+            job.last_error, job.updated_at = error, _now()
+            if retry_at is None:
+                job.status = "failed"
+                self._finish(job)
+            else:
+                job.status, job.run_after = "queued", retry_at
+                heapq.heappush(self._ready, (retry_at, job.id))
+
+    def jobs_for_session(self, session_id: int) -> List[MemoryJob]:
+        with self._lock:
+            return [j for j in self._jobs.values() if j.session_id == session_id]
+
+class SqlJobStore:
+    """
+    Durable job store on the background_jobs table. Jobs are claimed with a
+    conditional UPDATE, so any number of worker processes can poll it safely.
+    A claim holds the job for `lease` seconds; running jobs past their lease
+    are claimed again, and updates from the worker that lost it are ignored.
+    """
+    def __init__(self, lease: float = 300.0):
+        self.lease = lease
+
+    def enqueue(self, kind: str, idempotency_key: str, payload: Any, session_id: Optional[int], max_attempts: int, rerun: bool = False) -> BackgroundJob:
+        db = SessionLocal()
+        try:
+            job = db.query(BackgroundJob).filter(BackgroundJob.idempotency_key == idempotency_key).first()
+            if job and not _should_requeue(job, payload, rerun):
+                db.expunge(job)
+                return job
+            if job:
+                job.status, job.attempts, job.last_error, job.run_after = "queued", 0, None, _now()
+                job.payload = payload
+            else:
+                job = BackgroundJob(
+                    kind=kind,
+                    idempotency_key=idempotency_key,
+                    session_id=session_id,
+                    payload=payload,
+                    max_attempts=max_attempts,
+                    run_after=_now(),
+                )
+                db.add(job)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker enqueued the same key first
+                db.rollback()
+                job = db.query(BackgroundJob).filter(BackgroundJob.idempotency_key == idempotency_key).first()
+            db.refresh(job)
+            db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    def claim_next(self) -> Optional[BackgroundJob]:
+        db = SessionLocal()
+        try:
+            now = _now()
+            expired = and_(BackgroundJob.status == "running", BackgroundJob.locked_until < now)
+            # Jobs abandoned by a dead worker on their last attempt are failed, not retried
+            db.execute(
+                update(BackgroundJob)
+                .where(expired, BackgroundJob.attempts >= BackgroundJob.max_attempts)
+                .values(status="failed", last_error="Lease expired", updated_at=now)
+            )
+            db.commit()
+
+            claimable = or_(and_(BackgroundJob.status == "queued", BackgroundJob.run_after <= now), expired)
+            candidates = db.query(BackgroundJob.id, BackgroundJob.attempts).filter(
+                claimable
+            ).order_by(BackgroundJob.run_after, BackgroundJob.id).limit(5).all()
+            for job_id, attempts in candidates:
+                claimed = db.execute(
+                    update(BackgroundJob)
+                    .where(BackgroundJob.id == job_id, BackgroundJob.attempts == attempts, claimable)
+                    .values(
+                        status="running",
+                        attempts=attempts + 1,
+                        locked_until=now + timedelta(seconds=self.lease),
+                        updated_at=now,
+                    )
+                )
+                db.commit()
+                if claimed.rowcount == 1:
+                    job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+                    db.expunge(job)
+                    return job
+            return None
+        finally:
+            db.close()
+
+    def extend_lease(self, job) -> None:
+        self._update(job, locked_until=_now() + timedelta(seconds=self.lease))
+
+    def mark_succeeded(self, job, result: Any) -> None:
+        self._update(job, status="succeeded", result=result, last_error=None, locked_until=None)
+
+    def mark_failed(self, job, error: str, retry_at: Optional[datetime]) -> None:
+        if retry_at is None:
+            self._update(job, status="failed", last_error=error, locked_until=None)
+        else:
+            self._update(job, status="queued", last_error=error, run_after=retry_at, locked_until=None)
+
+    def _update(self, job, **values) -> None:
+        # Only the worker holding the current attempt may update a running job
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job.id, BackgroundJob.status == "running", BackgroundJob.attempts == job.attempts)
+                .values(updated_at=_now(), **values)
+            )
+            db.commit()
+            if result.rowcount == 0:
+                logger.warning("Background job %s (%s) lost its lease", job.id, job.kind)
+        finally:
+            db.close()
+
+    def jobs_for_session(self, session_id: int) -> List[BackgroundJob]:
+        db = SessionLocal()
+        try:
+            jobs = db.query(BackgroundJob).filter(
+                BackgroundJob.session_id == session_id
+            ).order_by(BackgroundJob.id).all()
+            db.expunge_all()
+            return jobs
+        finally:
+            db.close()
+
+class JobQueue:
+    def __init__(self, store, workers: int = 2, poll_interval: float = 1.0, retry_backoff: float = 2.0, max_attempts: int = 3):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.max_attempts = max_attempts
+        self._handlers: Dict[str, Callable[[dict], Any]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+    def register(self, kind: str):
+        def decorator(func: Callable[[dict], Any]):
+            self._handlers[kind] = func
+            return func
+        return decorator
+
+    def enqueue(self, kind: str, idempotency_key: str, payload: dict = None, session_id: Optional[int] = None, rerun: bool = False):
+        """
+        Queue a job, or return the existing one for this idempotency key.
+        With rerun=True a succeeded job is queued again if the payload differs,
+        while a queued or running one is still returned as is.
+        Safe to call from request threads.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = self.store.enqueue(kind, idempotency_key, payload or {}, session_id, self.max_attempts, rerun)
+        if self._loop is not None and job.status == "queued":
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return job
+
+    def jobs_for_session(self, session_id: int) -> list:
+        return self.store.jobs_for_session(session_id)
+
+    def _renew_lease(self, job, done: threading.Event) -> None:
+        while not done.wait(self.store.lease / 3):
+            try:
+                self.store.extend_lease(job)
+            except Exception:
+                logger.exception("Could not renew the lease on background job %s", job.id)
+
+    def run_job(self, job) -> None:
+        done = threading.Event()
+        if self.store.lease:
+            threading.Thread(target=self._renew_lease, args=(job, done), daemon=True).start()
+        try:
+            result = self._handlers[job.kind](job.payload or {})
+        except Exception as e:
+            logger.exception("Background job %s (%s) failed", job.id, job.kind)
+            retry_at = None
+            if job.attempts < job.max_attempts:
+                retry_at = _now() + timedelta(seconds=self.retry_backoff * 2 ** (job.attempts - 1))
+            self.store.mark_failed(job, str(e), retry_at)
+        else:
+            self.store.mark_succeeded(job, result)
+        finally:
+            done.set()
+
+    def run_pending(self) -> int:
+        """
+        Drain every job that is ready now in the calling thread. Used by the CLI.
+        """
+        count = 0
+        while True:
+            job = self.store.claim_next()
+            if job is None:
+                return count
+            self.run_job(job)
+            count += 1
+
+    async def _worker(self) -> None:
+        # Checked as well as cancelled: on Python 3.11 wait_for can swallow a
+        # cancel that lands as the wakeup event fires
+        while self._running:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim_next)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await asyncio.to_thread(self.run_job, job)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._running = True
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+job_queue = JobQueue(
+    SqlJobStore(lease=settings.JOB_LEASE_SECONDS) if settings.JOB_QUEUE_BACKEND == "sqlite"
+    else MemoryJobStore(retention=settings.JOB_RETENTION_SECONDS),
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+)
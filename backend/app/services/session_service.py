@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, cast, func, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.interview import InterviewSession, Question, Answer, Feedback, SessionFact
+from app.services.ai_service import ai_service
+from app.services.answer_index import answer_index
+from app.services.fact_service import FactIndex, extract_facts
+from app.services.job_service import job_queue
+
+# Session rollups and the background jobs that run after an answer or a
+# session is finished: improvement plans, score rollups and re-scoring.
+# Also closes abandoned sessions in bulk with set-based UPDATEs.
+
+logger = logging.getLogger(__name__)
+
+WEAK_ANSWER_SCORE = 70
+MAX_WEAK_ANSWERS = 3
+EXAMPLES_PER_ANSWER = 2
+
+def average_feedback_score(db: Session, session_id: int) -> Optional[int]:
+    """
+    Floor of the mean feedback score for a session, computed in one query.
+    """
+    total, count = db.query(func.sum(Feedback.score), func.count(Feedback.score)).join(
+        Answer, Feedback.answer_id == Answer.id
+    ).join(
+        Question, Answer.question_id == Question.id
+    ).filter(Question.session_id == session_id).one()
+    if not count:
+        return None
+    return int(total) // count
+
+def _duration_seconds_sql(db: Session, now: datetime):
+    """
+    Seconds between start_time and now, computed by the database.
+    """
+    now = literal(now, DateTime(timezone=True))
+    if db.get_bind().dialect.name == "sqlite":
+        return cast((func.julianday(now) - func.julianday(InterviewSession.start_time)) * 86400, Integer)
+    return cast(func.floor(func.extract("epoch", now - InterviewSession.start_time)), Integer)
+
+def _average_score_sql():
+    # Correlated per-session average, floored like the Python rollup by integer
+    # division (CAST(AVG) rounds on PostgreSQL); NULL when no answer has feedback
+    return select(
+        func.sum(Feedback.score).op("/")(func.count(Feedback.score))
+    ).select_from(Feedback).join(
+        Answer, Feedback.answer_id == Answer.id
+    ).join(
+        Question, Answer.question_id == Question.id
+    ).where(
+        Question.session_id == InterviewSession.id
+    ).scalar_subquery()
+
+def interrupt_sessions(db: Session, *criteria, now: Optional[datetime] = None) -> int:
+    """
+    Marks matching in_progress sessions interrupted with one UPDATE, filling in
+    end_time, total_duration and the average score in the database.
+    Does not commit. Returns the number of sessions closed.
+    """
+    now = now or datetime.now(timezone.utc)
+    result = db.execute(
+        update(InterviewSession)
+        .where(InterviewSession.status == "in_progress", *criteria)
+        .values(
+            status="interrupted",
+            end_time=now,
+            total_duration=_duration_seconds_sql(db, now),
+            score=func.coalesce(_average_score_sql(), InterviewSession.score),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def sweep_stale_sessions(db: Session, idle_timeout: timedelta, batch_size: int = 5000) -> int:
+    """
+    Closes sessions left in_progress for longer than idle_timeout, in batches
+    found through the (status, start_time) index. Returns the number closed.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    now = datetime.now(timezone.utc)
+    cutoff = now - idle_timeout
+    closed = 0
+    while True:
+        batch = select(InterviewSession.id).where(
+            InterviewSession.status == "in_progress",
+            InterviewSession.start_time < cutoff
+        ).limit(batch_size)
+        count = interrupt_sessions(db, InterviewSession.id.in_(batch.scalar_subquery()), now=now)
+        db.commit()
+        closed += count
+        if count < batch_size:
+            return closed
+
+async def periodic_sweep(idle_timeout: timedelta, interval: float, batch_size: int) -> None:
+    """
+    Lifespan task: sweep stale sessions every `interval` seconds.
+    """
+    def sweep() -> int:
+        db = SessionLocal()
+        try:
+            return sweep_stale_sessions(db, idle_timeout, batch_size)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            closed = await asyncio.to_thread(sweep)
+            if closed:
+                logger.info("Closed %s stale interview session(s)", closed)
+        except Exception:
+            logger.exception("Stale session sweep failed")
+        await asyncio.sleep(interval)
+
+def _feedback_version(db: Session, session_id: int) -> str:
+    """
+    Fingerprint of every answer score in the session; changes when any answer
+    is scored or re-scored.
+    """
+    scores = db.query(Feedback.answer_id, Feedback.score).join(
+        Answer, Feedback.answer_id == Answer.id
+    ).join(
+        Question, Answer.question_id == Question.id
+    ).filter(Question.session_id == session_id).order_by(Feedback.answer_id).all()
+    return hashlib.blake2b(repr([tuple(row) for row in scores]).encode(), digest_size=8).hexdigest()
+
+def enqueue_improvement_plan(db: Session, session: InterviewSession):
+    # The plan is built from the per-answer scores (which answers are weak and
+    # how weak), not just the session average, so key on all of them
+    return job_queue.enqueue(
+        "improvement_plan",
+        f"improvement_plan:{session.id}:{_feedback_version(db, session.id)}",
+        {"session_id": session.id},
+        session_id=session.id,
+    )
+
+def _weak_answers_with_examples(db: Session, session: InterviewSession) -> list:
+    """
+    The session's weakest answers, each with the user's own best-scoring
+    earlier answers to the same or a similar question from the answer index.
+    """
+    rows = db.query(Answer.id, Answer.user_audio_text, Question.text, Feedback.score).join(
+        Question, Answer.question_id == Question.id
+    ).outerjoin(
+        Feedback, Feedback.answer_id == Answer.id
+    ).filter(Question.session_id == session.id).all()
+
+    session_answer_ids = [answer_id for answer_id, _, _, _ in rows]
+    weak = sorted(
+        (r for r in rows if r[3] is not None and r[3] < WEAK_ANSWER_SCORE),
+        key=lambda r: r[3]
+    )[:MAX_WEAK_ANSWERS]
+
+    hits = {
+        answer_id: answer_index.query(
+            question_text, session.user_id, k=EXAMPLES_PER_ANSWER, exclude_answer_ids=session_answer_ids
+        )
+        for answer_id, _, question_text, _ in weak
+    }
+    example_ids = {h["answer_id"] for found in hits.values() for h in found}
+    texts = dict(
+        db.query(Answer.id, Answer.user_audio_text).filter(Answer.id.in_(example_ids)).all()
+    ) if example_ids else {}
+
+    return [
+        {
+            "question": question_text,
+            "answer": answer_text,
+            "score": score,
+            "examples": [
+                {"text": texts[h["answer_id"]], "score": h["score"]}
+                for h in hits[answer_id] if texts.get(h["answer_id"])
+            ]
+        }
+        for answer_id, answer_text, question_text, score in weak
+    ]
+
+@job_queue.register("improvement_plan")
+def build_improvement_plan(payload: dict) -> dict:
+    db = SessionLocal()
+    try:
+        session = db.query(InterviewSession).filter(InterviewSession.id == payload["session_id"]).first()
+        if not session:
+            return {"skipped": "session not found"}
+        plan = ai_service.generate_improvement_plan({
+            "id": session.id,
+            "score": session.score,
+            "status": session.status,
+            "weak_answers": _weak_answers_with_examples(db, session)
+        })
+        # Reassign so the JSON column is flagged as changed
+        session.session_metadata = {**(session.session_metadata or {}), "improvement_plan": plan}
+        db.commit()
+        return plan
+    finally:
+        db.close()
+
+@job_queue.register("session_rollup")
+def rollup_session(payload: dict) -> dict:
+    db = SessionLocal()
+    try:
+        session = db.query(InterviewSession).filter(InterviewSession.id == payload["session_id"]).first()
+        if not session:
+            return {"skipped": "session not found"}
+        session.score = average_feedback_score(db, session.id) or 0
+        db.commit()
+        if session.status == "completed":
+            enqueue_improvement_plan(db, session)
+        return {"score": session.score}
+    finally:
+        db.close()
+
+@job_queue.register("rescore_session")
+def rescore_session(payload: dict) -> dict:
+    """
+    Re-evaluates every answer in a session in order, rebuilding its fact index
+    as it goes, then queues a score rollup.
+    """
+    db = SessionLocal()
+    try:
+        session_id = payload["session_id"]
+        user_id = db.query(InterviewSession.user_id).filter(InterviewSession.id == session_id).scalar()
+        rows = db.query(Answer, Question.text).join(
+            Question, Answer.question_id == Question.id
+        ).filter(Question.session_id == session_id).order_by(Question.order, Answer.id).all()
+
+        db.query(SessionFact).filter(SessionFact.session_id == session_id).delete(synchronize_session=False)
+        index = FactIndex()
+        for answer, question_text in rows:
+            facts = extract_facts(answer.user_audio_text or "", question_text)
+            previous = (answer.feedback.evaluation_json if answer.feedback else None) or {}
+            evaluation = ai_service.evaluate_answer(
+                question_text,
+                answer.user_audio_text or "",
+                stress_mode=previous.get("stress_mode", False),
+                personality=previous.get("personality", "Neutral"),
+                contradictions=index.find_contradictions(facts)
+            )
+            for f in facts:
+                index.add(f)
+                db.add(SessionFact(session_id=session_id, answer_id=answer.id, **f))
+
+            if answer.feedback:
+                if answer.feedback.score is not None and answer.feedback.score >= answer_index.min_score:
+                    answer_index.remove(answer.id)
+                answer.feedback.evaluation_json = evaluation
+                answer.feedback.score = evaluation["score"]
+            else:
+                db.add(Feedback(answer_id=answer.id, evaluation_json=evaluation, score=evaluation["score"]))
+            answer_index.add(answer.id, question_text, evaluation["score"], user_id)
+        db.commit()
+
+        job_queue.enqueue(
+            "session_rollup",
+            f"session_rollup:{session_id}:{payload['run_key']}",
+            {"session_id": session_id},
+            session_id=session_id,
+        )
+        return {"rescored_answers": len(rows)}
+    finally:
+        db.close()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import uuid
+
+# Point the app at a throwaway database and answer index before it is imported
+_tmp = tempfile.mkdtemp(prefix="neurovisa-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["ANSWER_INDEX_PATH"] = os.path.join(_tmp, "answer_index")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.db.session import SessionLocal
+from app.main import app
+from app.services import admission_service
+from app.services.admission_service import AdmissionController
+from app.models.user import User
+
+API = "/api/v1"
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def make_user(db):
+    """
+    Creates a user and returns (user, auth headers). Skips password hashing.
+    """
+    def _make_user(visa_type: str = "Tourist", target_country: str = "USA"):
+        user = User(
+            email=f"{uuid.uuid4().hex}@example.com",
+            hashed_password="not-used",
+            full_name="Test User",
+            target_country=target_country,
+            visa_type=visa_type,
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        token = security.create_access_token(user.id)
+        return user, {"Authorization": f"Bearer {token}"}
+    return _make_user
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def controller(monkeypatch):
+    def _configure(**kwargs):
+        c = AdmissionController(**{
+            "rate_per_sec": 1.0, "burst": 10, "max_concurrent": 8,
+            "max_queue": 32, "queue_timeout": 10.0, **kwargs
+        })
+        monkeypatch.setattr(admission_service, "admission_controller", c)
+        monkeypatch.setattr("app.api.deps.admission_controller", c)
+        monkeypatch.setattr("app.api.endpoints.interview.admission_controller", c)
+        return c
+    return _configure
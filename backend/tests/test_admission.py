@@ -0,0 +1,159 @@
+import asyncio
+import math
+import time
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services.admission_service import AdmissionController, AdmissionRejected
+from app.services.ai_service import ai_service
+
+from conftest import API
+
+ANSWER_TEXT = "I am visiting my sister for two weeks and I will return to my job as an accountant afterwards."
+
+@pytest.fixture
+def slow_evaluation(monkeypatch):
+    def _slow(seconds: float):
+        original = ai_service.evaluate_answer
+        def evaluate(*args, **kwargs):
+            time.sleep(seconds) # Stands in for a model call holding a worker thread
+            return original(*args, **kwargs)
+        monkeypatch.setattr(ai_service, "evaluate_answer", evaluate)
+    return _slow
+
+def p99(latencies):
+    ordered = sorted(latencies)
+    return ordered[math.ceil(0.99 * len(ordered)) - 1]
+
+async def timed(client, method, url, **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return response, time.perf_counter() - start
+
+async def start_session(client, headers):
+    response = await client.post(f"{API}/interview/start", headers=headers)
+    assert response.status_code == 200
+    return response.json()["questions"][0]["id"]
+
+def async_client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60)
+
+@pytest.mark.anyio
+async def test_rejects_with_retry_after_when_queue_full():
+    c = AdmissionController(rate_per_sec=100, burst=100, max_concurrent=1, max_queue=1, queue_timeout=5)
+    await c.acquire("1")
+    queued = asyncio.ensure_future(c.acquire("2"))
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected) as e:
+        await c.acquire("3")
+    assert e.value.reason == "Evaluation queue is full"
+    c.release() # Hands the slot to the queued request
+    await queued
+    assert c.metrics()["active_evaluations"] == 1
+    assert c.metrics()["rejected"]["queue_full"] == 1
+    c.release()
+    assert c.metrics()["active_evaluations"] == 0
+
+@pytest.mark.anyio
+async def test_queue_timeout_does_not_leak_slots():
+    c = AdmissionController(rate_per_sec=100, burst=100, max_concurrent=1, max_queue=4, queue_timeout=0.05)
+    await c.acquire("1")
+    with pytest.raises(AdmissionRejected):
+        await c.acquire("2")
+    c.release()
+    metrics = c.metrics()
+    assert (metrics["active_evaluations"], metrics["queue_depth"]) == (0, 0)
+
+@pytest.mark.anyio
+async def test_rate_limit_returns_429(controller, make_user):
+    controller(burst=2, rate_per_sec=0.01)
+    _, headers = make_user()
+    async with async_client() as client:
+        question_id = await start_session(client, headers)
+        statuses = []
+        for _ in range(3):
+            r = await client.post(f"{API}/interview/answer", headers=headers,
+                                  json={"question_id": question_id, "user_audio_text": ANSWER_TEXT})
+            statuses.append(r.status_code)
+        assert statuses == [200, 429, 429]
+        assert int(r.headers["Retry-After"]) >= 1
+
+@pytest.mark.anyio
+async def test_queued_requests_do_not_starve_threadpool(controller, make_user, slow_evaluation):
+    """
+    A full wait queue (max_concurrent + max_queue = 40, the size of the default
+    threadpool) must not delay unrelated endpoints.
+    """
+    controller(max_concurrent=8, max_queue=32)
+    users = [make_user() for _ in range(40)]
+    _, observer = make_user()
+
+    async with async_client() as client:
+        questions = [await start_session(client, h) for _, h in users]
+        slow_evaluation(0.5)
+
+        flood = [
+            asyncio.ensure_future(client.post(
+                f"{API}/interview/answer", headers=h,
+                json={"question_id": q, "user_audio_text": ANSWER_TEXT}
+            ))
+            for (_, h), q in zip(users, questions)
+        ]
+        await asyncio.sleep(0.2)
+        latencies = []
+        for _ in range(10):
+            r, elapsed = await timed(client, "GET", f"{API}/interview/my-sessions", headers=observer)
+            assert r.status_code == 200
+            latencies.append(elapsed)
+            await asyncio.sleep(0.1)
+        responses = await asyncio.gather(*flood)
+
+    assert [r.status_code for r in responses] == [200] * 40
+    assert max(latencies) < 1.0
+
+@pytest.mark.anyio
+async def test_well_behaved_p99_stable_while_abuser_throttled(controller, make_user, slow_evaluation):
+    controller(max_concurrent=8, max_queue=32, burst=10, rate_per_sec=1.0)
+    good_users = [make_user() for _ in range(6)]
+    _, abuser = make_user()
+
+    async with async_client() as client:
+        good_questions = [await start_session(client, h) for _, h in good_users]
+        abuser_question = await start_session(client, abuser)
+        slow_evaluation(0.05)
+
+        async def well_behaved(headers, question_id, rounds=4):
+            latencies = []
+            for _ in range(rounds):
+                r, elapsed = await timed(client, "POST", f"{API}/interview/answer", headers=headers,
+                                         json={"question_id": question_id, "user_audio_text": ANSWER_TEXT})
+                assert r.status_code == 200
+                latencies.append(elapsed)
+                r, elapsed = await timed(client, "GET", f"{API}/interview/my-sessions", headers=headers)
+                assert r.status_code == 200
+                latencies.append(elapsed)
+                await asyncio.sleep(0.05)
+            return latencies
+
+        async def run_good_users():
+            results = await asyncio.gather(*(well_behaved(h, q) for (_, h), q in zip(good_users, good_questions)))
+            return [l for user_latencies in results for l in user_latencies]
+
+        baseline = await run_good_users()
+
+        abuse = [
+            asyncio.ensure_future(client.post(
+                f"{API}/interview/answer", headers=abuser,
+                json={"question_id": abuser_question, "user_audio_text": ANSWER_TEXT}
+            ))
+            for _ in range(200)
+        ]
+        under_abuse = await run_good_users()
+        abuse_responses = await asyncio.gather(*abuse)
+
+    rejected = [r for r in abuse_responses if r.status_code == 429]
+    assert len(rejected) >= 180
+    assert all("Retry-After" in r.headers for r in rejected)
+    assert p99(under_abuse) <= 2 * p99(baseline) + 0.25, (p99(baseline), p99(under_abuse))
@@ -0,0 +1,91 @@
+import statistics
+import time
+
+from app.models.interview import Feedback, InterviewSession
+from app.services import answer_index as answer_index_module
+from app.services.ai_service import ai_service
+from app.services.answer_index import AnswerIndex
+from app.services.session_service import enqueue_improvement_plan
+
+from conftest import API
+
+QUESTIONS = [
+    "Why do you want to study in the United States?",
+    "Who is sponsoring your trip?",
+    "How long do you plan to stay in the country?",
+    "What will you do after you graduate?",
+    "Do you have relatives in the United States?",
+]
+
+def test_lookups_only_return_the_users_own_answers(tmp_path):
+    index = AnswerIndex(str(tmp_path), min_score=80)
+    index.add(1, QUESTIONS[1], 95, user_id=7)
+    index.add(2, QUESTIONS[1], 90, user_id=8)
+    index.add(3, QUESTIONS[1], 85, user_id=7)
+
+    assert [h["answer_id"] for h in index.query(QUESTIONS[1], user_id=7)] == [1, 3]
+    index.save()
+    index.add(4, QUESTIONS[1], 99, user_id=8)
+    assert [h["answer_id"] for h in index.query(QUESTIONS[1], user_id=7)] == [1, 3]
+    assert [h["answer_id"] for h in index.query(QUESTIONS[1], user_id=8)] == [4, 2]
+    assert index.query(QUESTIONS[1], user_id=9) == []
+
+def test_each_question_is_vectorized_once(tmp_path, monkeypatch):
+    calls = []
+    vectorize = answer_index_module.vectorize
+    monkeypatch.setattr(answer_index_module, "vectorize", lambda text, dim: calls.append(text) or vectorize(text, dim))
+
+    index = AnswerIndex(str(tmp_path), min_score=80)
+    start = time.perf_counter()
+    index.add_many((i, QUESTIONS[i % len(QUESTIONS)], 90, i % 1000) for i in range(200_000))
+    index.save()
+    elapsed = time.perf_counter() - start
+    assert len(calls) == len(QUESTIONS), len(calls)
+    assert elapsed < 10, elapsed
+
+    # Questions already on disk reuse their stored row
+    index.add(200_001, QUESTIONS[0], 90, user_id=1)
+    assert len(calls) == len(QUESTIONS)
+
+def test_query_latency_with_a_million_answers(tmp_path):
+    index = AnswerIndex(str(tmp_path), min_score=80)
+    questions = [f"{q} (variant {v})" for v in range(60) for q in QUESTIONS]
+    index.add_many(
+        (i, questions[i % len(questions)], 80 + i % 19, i // 50) for i in range(1_000_000)
+    )
+    index.save()
+    assert len(index) == 1_000_000
+
+    latencies = []
+    for user_id in range(0, 20_000, 100):
+        start = time.perf_counter()
+        hits = index.query(QUESTIONS[user_id % len(QUESTIONS)], user_id, k=2)
+        latencies.append(time.perf_counter() - start)
+        assert len(hits) == 2
+    assert statistics.median(latencies) < 0.005, statistics.median(latencies)
+
+def test_plan_uses_every_example():
+    plan = ai_service.generate_improvement_plan({"score": 60, "weak_answers": [{
+        "question": QUESTIONS[1], "answer": "My dad pays.", "score": 40,
+        "examples": [{"text": "My father is sponsoring me.", "score": 95}, {"text": "My parents cover tuition.", "score": 90}],
+    }]})
+    assert [a["improved"] for a in plan["improved_answers"]] == ["My father is sponsoring me.", "My parents cover tuition."]
+
+def test_plan_key_changes_when_an_answer_is_rescored(client, make_user, controller, db):
+    controller(rate_per_sec=100, burst=100)
+    _, headers = make_user()
+    session = client.post(f"{API}/interview/start", headers=headers).json()
+    answered = client.post(f"{API}/interview/answer", headers=headers, json={
+        "question_id": session["questions"][0]["id"], "user_audio_text": "To study computer science."
+    }).json()
+    client.post(f"{API}/interview/{session['id']}/complete", headers=headers)
+
+    session_obj = db.query(InterviewSession).filter(InterviewSession.id == session["id"]).one()
+    first = enqueue_improvement_plan(db, session_obj)
+    assert enqueue_improvement_plan(db, session_obj).idempotency_key == first.idempotency_key
+
+    # A rescore changed one answer; the session score (the old key) stays the same
+    feedback = db.query(Feedback).filter(Feedback.answer_id == answered["id"]).one()
+    feedback.score += 1
+    db.commit()
+    assert enqueue_improvement_plan(db, session_obj).idempotency_key != first.idempotency_key
@@ -0,0 +1,88 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from sqlalchemy import create_engine, insert
+
+from app.db.session import Base
+from app.models.interview import InterviewSession, Question, Answer, Feedback
+from app.models.user import User
+
+from conftest import API
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTIONS_PER_SESSION = 5
+
+# Exports user 1 in a fresh interpreter and reports (lines, peak RSS in KiB).
+# VmHWM is per address space; ru_maxrss would carry over the forking pytest process.
+EXPORT_SCRIPT = textwrap.dedent("""
+    from app.db.session import SessionLocal
+    from app.models import interview, user # Configure every mapper
+    from app.services.export_service import export_user_history
+
+    db = SessionLocal()
+    lines = sum(chunk.count(b"\\n") for chunk in export_user_history(db, 1))
+    with open("/proc/self/status") as f:
+        peak = next(line.split()[1] for line in f if line.startswith("VmHWM:"))
+    print(lines, peak)
+""")
+
+def _seed(url: str, sessions: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    evaluation = {"score": 72, "feedback": "x" * 400, "red_flags": [], "metrics": {"clarity": 70}}
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "export@example.com", "hashed_password": "not-used"}])
+        conn.execute(insert(InterviewSession), [
+            {"id": s, "user_id": 1, "status": "completed", "score": 72} for s in range(1, sessions + 1)
+        ])
+        ids = range(1, sessions * QUESTIONS_PER_SESSION + 1)
+        conn.execute(insert(Question), [
+            {"id": i, "session_id": (i - 1) // QUESTIONS_PER_SESSION + 1, "text": "Why this university?", "order": i}
+            for i in ids
+        ])
+        conn.execute(insert(Answer), [
+            {"id": i, "question_id": i, "user_audio_text": "I chose it for its research labs. " * 8} for i in ids
+        ])
+        conn.execute(insert(Feedback), [
+            {"id": i, "answer_id": i, "score": 72, "evaluation_json": evaluation} for i in ids
+        ])
+    engine.dispose()
+
+def _export_peak_rss(tmp_path, sessions: int):
+    url = f"sqlite:///{tmp_path}/export-{sessions}.db"
+    _seed(url, sessions)
+    out = subprocess.run(
+        [sys.executable, "-c", EXPORT_SCRIPT],
+        cwd=BACKEND_DIR, env={**os.environ, "DATABASE_URL": url},
+        capture_output=True, text=True,
+    )
+    assert out.returncode == 0, out.stderr
+    out = out.stdout.split()
+    lines, rss_kib = int(out[-2]), int(out[-1])
+    assert lines == sessions
+    return rss_kib
+
+def test_export_streams_one_line_per_session(client, make_user, controller):
+    controller(rate_per_sec=100, burst=100)
+    _, headers = make_user()
+    for _ in range(3):
+        assert client.post(f"{API}/interview/start", headers=headers).status_code == 200
+
+    response = client.get(f"{API}/interview/export", headers=headers)
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 3
+    assert [r["status"] for r in records] == ["interrupted", "interrupted", "in_progress"]
+    assert all(r["questions"] for r in records)
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="reads VmHWM from /proc")
+def test_export_peak_memory_does_not_grow_with_history(tmp_path):
+    # 20k sessions is ~80 MB of NDJSON and buffering it would add hundreds of MB;
+    # streaming only holds one batch of sessions at a time
+    small = _export_peak_rss(tmp_path, 10)
+    large = _export_peak_rss(tmp_path, 20_000)
+    assert large - small < 40 * 1024, (small, large)
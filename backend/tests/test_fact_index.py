@@ -0,0 +1,92 @@
+import time
+
+from app.models.interview import SessionFact
+from app.services.fact_service import FactIndex, extract_facts
+
+from conftest import API
+
+def _facts(text, question=""):
+    return {(f["kind"], f["key"]): f["value"] for f in extract_facts(text, question)}
+
+def test_number_words_need_a_word_boundary():
+    assert ("duration", "stay") not in _facts("I will visit Canada year round with my family")
+    assert ("duration", "stay") not in _facts("I will visit someone weeks after I arrive")
+    assert ("duration", "stay") not in _facts("I travel often, years ago I went to Paris")
+
+def test_duration_binds_to_stay_only_when_governed_by_a_stay_word():
+    facts = _facts("I will visit my sister, who has lived in Toronto for 5 years")
+    assert ("duration", "stay") not in facts
+
+    assert _facts("I will stay in Toronto for two weeks")[("duration", "stay")] == "14 days"
+    assert _facts("It is a three-week trip to see my sister")[("duration", "stay")] == "21 days"
+
+def test_duration_answering_a_how_long_question_is_the_stay():
+    facts = _facts("About three weeks.", "How long do you plan to stay in the country?")
+    assert facts[("duration", "stay")] == "21 days"
+    assert ("duration", "stay") not in _facts("About three weeks.", "Why do you want to visit?")
+
+def test_negated_scholarship_is_not_a_sponsor():
+    facts = _facts("I applied for a scholarship but did not get it, so my parents are paying")
+    assert facts[("sponsor", "sponsor")] == "parents"
+    assert len([f for f in extract_facts("I applied for a scholarship but did not get it") if f["kind"] == "sponsor"]) == 0
+    assert _facts("I received a full scholarship")[("sponsor", "sponsor")] == "scholarship"
+
+def _contradictions(*answers):
+    index = FactIndex()
+    for text in answers[:-1]:
+        for f in extract_facts(text):
+            index.add(f)
+    return index.find_contradictions(extract_facts(answers[-1]))
+
+def test_only_first_person_jobs_are_the_applicants_employer():
+    assert ("institution", "employer") not in _facts("My father is a manager at Tata Steel.")
+    assert _facts("I am a software developer at Infosys.")[("institution", "employer")] == "infosys"
+    assert _contradictions("I work at Infosys as a developer.", "My father is a manager at Tata Steel.") == []
+
+def test_new_universities_and_sponsors_are_not_contradictions():
+    assert _contradictions(
+        "I was admitted to Stanford University.", "I also applied to Cornell University and Duke University."
+    ) == []
+    assert _contradictions("A full scholarship covers my tuition.", "My parents are paying for my living expenses.") == []
+    assert _contradictions("My parents are paying", "My uncle is paying") == []
+
+def test_negation_or_replacement_contradicts_the_earlier_claim():
+    [c] = _contradictions("My parents are paying", "My uncle is paying instead of my parents")
+    assert c["value"] == "not parents" and c["previous_value"] == "parents"
+    [c] = _contradictions("I work at Infosys.", "I don't work at Infosys anymore.")
+    assert c["value"] == "not infosys" and c["previous_value"] == "infosys"
+    [c] = _contradictions("I received a scholarship", "I did not get a scholarship")
+    assert c["previous_value"] == "scholarship"
+    # The latest statement about a value decides
+    assert _contradictions("My parents are paying", "My parents are not paying", "My parents are paying again") != []
+    assert _contradictions("I work at Infosys.", "I left Infosys.", "I no longer work at Infosys") == []
+
+def test_reports_the_value_actually_compared():
+    [c] = _contradictions("I will stay for two weeks", "I will stay for three months", "I will stay for one year")
+    assert c["previous_value"] == "90 days"
+
+def test_answer_latency_stays_flat_over_a_long_session(client, make_user, controller, db):
+    controller(rate_per_sec=1000, burst=1000)
+    _, headers = make_user()
+    response = client.post(f"{API}/interview/start", headers=headers)
+    question_id = response.json()["questions"][0]["id"]
+    answers = [
+        "I will stay for two weeks and my parents are paying",
+        "Tuition is $40,000 and my father will cover it",
+        "I work at Acme Corp as an engineer",
+        "I will study at Stanford University",
+    ]
+
+    latencies = []
+    for i in range(60):
+        start = time.perf_counter()
+        r = client.post(f"{API}/interview/answer", headers=headers, json={
+            "question_id": question_id, "user_audio_text": answers[i % len(answers)]
+        })
+        latencies.append(time.perf_counter() - start)
+        assert r.status_code == 200
+
+    session_id = response.json()["id"]
+    assert db.query(SessionFact).filter(SessionFact.session_id == session_id).count() >= 60
+    first, last = sorted(latencies[:10])[5], sorted(latencies[-10:])[5]
+    assert last < first * 2 + 0.02, (first, last)
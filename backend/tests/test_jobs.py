@@ -0,0 +1,167 @@
+import asyncio
+import statistics
+import threading
+import time
+import uuid
+
+from app.models.interview import Answer, Feedback
+from app.services import session_service
+from app.services.job_service import JobQueue, MemoryJobStore, SqlJobStore, job_queue
+
+from conftest import API
+
+def _unique_session_id() -> int:
+    return uuid.uuid4().int % 10**9
+
+def test_rescore_keeps_stress_mode_and_personality(client, make_user, controller, db):
+    controller(rate_per_sec=100, burst=100)
+    _, headers = make_user()
+    session = client.post(f"{API}/interview/start", headers=headers).json()
+    answered = client.post(f"{API}/interview/answer", headers=headers, json={
+        "question_id": session["questions"][0]["id"],
+        "user_audio_text": "Maybe I will travel, I don't know yet",
+        "stress_mode": True,
+        "officer_personality": "Strict",
+    }).json()
+
+    session_service.rescore_session({"session_id": session["id"], "run_key": "test"})
+
+    feedback = db.query(Feedback).join(Answer).filter(Answer.id == answered["id"]).one()
+    assert feedback.evaluation_json["stress_mode"] is True
+    assert feedback.evaluation_json["personality"] == "Strict"
+    assert feedback.score == answered["feedback"]["score"]
+
+def test_one_rescore_job_per_session(client, make_user, controller):
+    controller(rate_per_sec=100, burst=100)
+    _, headers = make_user()
+    session_id = client.post(f"{API}/interview/start", headers=headers).json()["id"]
+
+    first = client.post(f"{API}/interview/{session_id}/rescore", headers=headers).json()
+    second = client.post(f"{API}/interview/{session_id}/rescore", headers=headers).json()
+    assert first["id"] == second["id"]
+    assert first["idempotency_key"] == f"rescore_session:{session_id}"
+
+def test_rerun_joins_active_job_and_restarts_finished_one():
+    queue = JobQueue(MemoryJobStore())
+    queue.register("rescore_session")(lambda payload: None)
+
+    job = queue.enqueue("rescore_session", "rescore:1", {"run_key": "a"}, rerun=True)
+    assert queue.enqueue("rescore_session", "rescore:1", {"run_key": "b"}, rerun=True) is job
+    assert job.payload == {"run_key": "a"}
+
+    assert queue.run_pending() == 1
+    # Same request again (same Idempotency-Key) returns the finished run
+    assert queue.enqueue("rescore_session", "rescore:1", {"run_key": "a"}, rerun=True).status == "succeeded"
+    again = queue.enqueue("rescore_session", "rescore:1", {"run_key": "c"}, rerun=True)
+    assert again.id == job.id and again.status == "queued" and again.payload == {"run_key": "c"}
+
+def test_memory_store_prunes_finished_jobs():
+    store = MemoryJobStore(max_finished=10)
+    queue = JobQueue(store)
+    queue.register("noop")(lambda payload: None)
+    for i in range(50):
+        queue.enqueue("noop", f"noop:{i}")
+    assert queue.run_pending() == 50
+    assert len(store._jobs) == 10 and len(store._by_key) == 10
+
+    store.retention = 0
+    queue.enqueue("noop", "noop:last")
+    queue.run_pending()
+    assert len(store._jobs) <= 1
+
+def test_sql_store_reclaims_jobs_past_their_lease():
+    store = SqlJobStore(lease=0.05)
+    session_id = _unique_session_id()
+    store.enqueue("noop", f"lease:{session_id}", {}, session_id, 3)
+
+    first = store.claim_next()
+    assert first.attempts == 1 and store.claim_next() is None
+    time.sleep(0.1) # The worker holding it died
+    second = store.claim_next()
+    assert second.id == first.id and second.attempts == 2
+
+    store.mark_succeeded(first, "stale") # Ignored: this worker lost the lease
+    [job] = store.jobs_for_session(session_id)
+    assert job.status == "running"
+    store.mark_succeeded(second, "done")
+    [job] = store.jobs_for_session(session_id)
+    assert job.status == "succeeded" and job.result == "done" and job.locked_until is None
+
+def test_sql_store_fails_expired_job_on_its_last_attempt():
+    store = SqlJobStore(lease=0.05)
+    session_id = _unique_session_id()
+    store.enqueue("noop", f"lease:{session_id}", {}, session_id, 1)
+    assert store.claim_next() is not None
+    time.sleep(0.1)
+    assert store.claim_next() is None
+    [job] = store.jobs_for_session(session_id)
+    assert job.status == "failed" and job.last_error == "Lease expired"
+
+def test_running_job_renews_its_lease():
+    store = SqlJobStore(lease=0.15)
+    queue = JobQueue(store)
+    queue.register("slow")(lambda payload: time.sleep(0.5))
+    session_id = _unique_session_id()
+    queue.enqueue("slow", f"slow:{session_id}", session_id=session_id)
+
+    worker = threading.Thread(target=queue.run_pending)
+    worker.start()
+    time.sleep(0.3) # Past the original lease
+    assert store.claim_next() is None
+    worker.join()
+    [job] = store.jobs_for_session(session_id)
+    assert job.status == "succeeded" and job.attempts == 1
+
+def test_request_latency_does_not_depend_on_job_cost(client, make_user, monkeypatch):
+    monkeypatch.setitem(job_queue._handlers, "load_test", lambda payload: time.sleep(payload["seconds"]))
+    _, headers = make_user()
+
+    def median_latency(job_seconds: float) -> float:
+        for _ in range(job_queue.workers * 2):
+            job_queue.enqueue("load_test", f"load_test:{uuid.uuid4().hex}", {"seconds": job_seconds})
+        time.sleep(0.05) # Let the workers pick the jobs up
+        latencies = []
+        for _ in range(20):
+            start = time.perf_counter()
+            assert client.get(f"{API}/interview/my-sessions", headers=headers).status_code == 200
+            latencies.append(time.perf_counter() - start)
+        return statistics.median(latencies)
+
+    cheap = median_latency(0.0)
+    expensive = median_latency(1.0)
+    assert expensive < cheap * 2 + 0.02, (cheap, expensive)
+
+def test_stop_does_not_hang_when_a_wakeup_races_the_cancel():
+    async def scenario():
+        queue = JobQueue(MemoryJobStore(), workers=2, poll_interval=0.05)
+        queue.register("noop")(lambda payload: None)
+        await queue.start()
+        await asyncio.sleep(0.01)
+        for i in range(20):
+            queue.enqueue("noop", f"race:{i}")
+            queue._wakeup.set() # Fires together with the cancel below
+            await asyncio.wait_for(queue.stop(), timeout=2)
+            await queue.start()
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+def test_reading_a_session_does_not_queue_or_retry_its_plan(client, make_user, controller, monkeypatch):
+    controller(rate_per_sec=100, burst=100)
+    monkeypatch.setitem(job_queue._handlers, "improvement_plan", lambda payload: 1 / 0)
+    monkeypatch.setattr(job_queue, "max_attempts", 1)
+    _, headers = make_user()
+    session_id = client.post(f"{API}/interview/start", headers=headers).json()["id"]
+    client.post(f"{API}/interview/{session_id}/complete", headers=headers)
+
+    for _ in range(50):
+        body = client.get(f"{API}/interview/{session_id}", headers=headers).json()
+        if body["improvement_plan_status"] == "failed":
+            break
+        time.sleep(0.02)
+    assert body["improvement_plan"] is None and body["improvement_plan_status"] == "failed"
+
+    for _ in range(3):
+        client.get(f"{API}/interview/{session_id}", headers=headers)
+    [job] = [j for j in job_queue.jobs_for_session(session_id) if j.kind == "improvement_plan"]
+    assert job.status == "failed" and job.attempts == 1
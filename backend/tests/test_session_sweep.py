@@ -0,0 +1,60 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app import cli
+from app.db.session import Base
+from app.models.interview import InterviewSession, Question, Answer, Feedback
+from app.models.user import User
+from app.services.session_service import sweep_stale_sessions
+
+def _seeded_db(tmp_path, sessions: int, stale: int):
+    engine = create_engine(f"sqlite:///{tmp_path}/sweep.db")
+    Base.metadata.create_all(bind=engine)
+    old = datetime.now(timezone.utc) - timedelta(hours=5)
+    recent = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "sweep@example.com", "hashed_password": "not-used"}])
+        conn.execute(insert(InterviewSession), [
+            {"id": s, "user_id": 1, "status": "in_progress", "start_time": old if s <= stale else recent}
+            for s in range(1, sessions + 1)
+        ])
+        # One answered question per session; session 1 averages 67.5, which must floor to 67
+        conn.execute(insert(Question), [
+            {"id": s, "session_id": s, "text": "Why?", "order": 1} for s in range(1, sessions + 1)
+        ] + [{"id": sessions + 1, "session_id": 1, "text": "Why now?", "order": 2}])
+        conn.execute(insert(Answer), [
+            {"id": q, "question_id": q, "user_audio_text": "Because."} for q in range(1, sessions + 2)
+        ])
+        conn.execute(insert(Feedback), [
+            {"id": q, "answer_id": q, "score": 67 if q == 1 else 68 if q == sessions + 1 else 75}
+            for q in range(1, sessions + 2)
+        ])
+    return sessionmaker(bind=engine)()
+
+def test_sweep_floors_the_average_and_skips_recent_sessions(tmp_path):
+    db = _seeded_db(tmp_path, sessions=30, stale=20)
+    assert sweep_stale_sessions(db, timedelta(hours=2), batch_size=7) == 20
+    rows = dict(db.execute(select(InterviewSession.id, InterviewSession.status)).all())
+    assert [s for s, status in rows.items() if status == "interrupted"] == list(range(1, 21))
+    first = db.get(InterviewSession, 1)
+    assert first.score == 67 and first.total_duration >= 5 * 3600 - 1
+
+def test_sweep_rejects_non_positive_batch_size(tmp_path):
+    db = _seeded_db(tmp_path, sessions=1, stale=1)
+    with pytest.raises(ValueError):
+        sweep_stale_sessions(db, timedelta(hours=2), batch_size=0)
+    with pytest.raises(SystemExit):
+        cli.main(["sweep-sessions", "--batch-size", "0"])
+
+def test_sweep_of_100k_stale_sessions(tmp_path):
+    db = _seeded_db(tmp_path, sessions=110_000, stale=100_000)
+    start = time.perf_counter()
+    closed = sweep_stale_sessions(db, timedelta(hours=2), batch_size=5000)
+    elapsed = time.perf_counter() - start
+    assert closed == 100_000
+    assert db.query(InterviewSession).filter(InterviewSession.status == "in_progress").count() == 10_000
+    assert elapsed < 15, elapsed
@@ -60,6 +60,21 @@ const Report = () => {
         fetchData();
     }, [sessionId]);
 
+    // The improvement plan is built in the background; refetch until its job settles
+    const planPending = ['queued', 'running'].includes(session?.improvement_plan_status);
+    useEffect(() => {
+        if (!planPending) return;
+        const timer = setTimeout(async () => {
+            try {
+                const response = await api.get(`/interview/${sessionId}`);
+                setSession(response.data);
+            } catch (err) {
+                console.error("Failed to refresh improvement plan", err);
+            }
+        }, 2000);
+        return () => clearTimeout(timer);
+    }, [session, planPending, sessionId]);
+
     if (loading) return (
         <div className="min-h-screen flex items-center justify-center bg-background">
             <motion.div